@@ -0,0 +1,87 @@
+#!/usr/bin/python
+"""Peak memory and time of the autoload of a large chassis.
+
+Builds the resource model of a chassis with the given number of modules and
+ports per module, as the SNMP autoload does, and the AutoLoadDetails from it,
+with the standard and the compact networking resource model.
+
+Usage: PYTHONPATH=src python benchmarks/inventory_memory_benchmark.py
+    [modules] [ports per module]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from unittest.mock import Mock
+
+from cloudshell.shell.standards.networking.autoload_model import NetworkingResourceModel
+
+from inventory_model import CompactNetworkingResourceModel
+
+
+def get_api():
+    api = Mock()
+    api.GetResourceDetails.return_value = Mock(UniqeIdentifier="uid", ChildResources=[])
+    return api
+
+
+def discover(model_class, modules, ports):
+    resource_model = model_class(
+        "Switch", "Cisco IOS Switch 2G", "CS_Switch", get_api()
+    )
+    resource_model.vendor = "Cisco"
+    resource_model.model_name = "C9600"
+    entities = resource_model.entities
+    chassis = entities.Chassis(index="1")
+    chassis.model = "C9606R"
+    chassis.serial_number = "FXS2214Q1AB"
+    resource_model.connect_chassis(chassis)
+    for module_index in range(1, modules + 1):
+        module = entities.Module(index=str(module_index))
+        module.model = "C9600-LC-48YL"
+        module.serial_number = f"CAT{module_index:08}"
+        chassis.connect_module(module)
+        for port_index in range(1, ports + 1):
+            port = entities.Port(
+                index=str(port_index),
+                name=f"TwentyFiveGigE{module_index}-0-{port_index}",
+            )
+            port.mac_address = f"00:1a:2b:{module_index:02x}:{port_index:02x}:00"
+            port.port_description = f"server {module_index}-{port_index}"
+            port.l2_protocol_type = "ethernet"
+            port.bandwidth = 25000
+            port.mtu = 9216
+            port.duplex = "Full"
+            port.auto_negotiation = "True"
+            module.connect_port(port)
+    return resource_model.build()
+
+
+def measure(model_class, modules, ports):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    details = discover(model_class, modules, ports)
+    duration = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return details, peak, duration
+
+
+def main(modules=100, ports=100):
+    print(f"{modules} modules x {ports} ports")  # noqa: T201
+    for name, model_class in (
+        ("standard", NetworkingResourceModel),
+        ("compact", CompactNetworkingResourceModel),
+    ):
+        details, peak, duration = measure(model_class, modules, ports)
+        print(  # noqa: T201
+            f"{name:<10} {len(details.resources)} resources, "
+            f"{len(details.attributes)} attributes, "
+            f"peak {peak / 2**20:7.1f} MiB, {duration:6.2f} sec"
+        )
+        del details
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
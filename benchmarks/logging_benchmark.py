@@ -0,0 +1,68 @@
+#!/usr/bin/python
+"""Command latency with CLI transcript logging on and off.
+
+Simulates a command that reads a large output (like show running-config)
+in small chunks and logs every chunk at DEBUG level, as the CLI session
+does, and measures the time spent in the command with different handlers.
+
+Usage: PYTHONPATH=src python benchmarks/logging_benchmark.py [chunks]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from cloudshell.logging.interprocess_logger import MultiProcessingLog
+
+from transcript_logging import TranscriptFilter
+
+CHUNK = "interface GigabitEthernet0/1\n description uplink\n no shutdown\n" * 4
+
+
+def run_command(logger, chunks):
+    started = time.perf_counter()
+    for _ in range(chunks):
+        logger.debug(CHUNK)
+    return time.perf_counter() - started
+
+
+def get_logger(name, handler, transcript=True):
+    logger = logging.Logger(name, logging.DEBUG)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    if not transcript:
+        logger.addFilter(TranscriptFilter())
+    return logger
+
+
+def main(chunks=5000):
+    # makeRecord refuses to override "module", set it with a record factory
+    factory = logging.getLogRecordFactory()
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.module = "expect_session"
+        return record
+
+    logging.setLogRecordFactory(record_factory)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = {
+            "file handler (sync)": lambda path: logging.FileHandler(path),
+            "MultiProcessingLog (default)": lambda path: MultiProcessingLog(path),
+        }
+        print(f"{chunks} transcript records of {len(CHUNK)} bytes")  # noqa: T201
+        for name, get_handler in cases.items():
+            for transcript in (True, False):
+                path = os.path.join(tmp_dir, f"{len(name)}-{transcript}.log")
+                handler = get_handler(path)
+                latency = run_command(get_logger(name, handler, transcript), chunks)
+                handler.close()
+                mode = "on: " if transcript else "off:"
+                print(  # noqa: T201
+                    f"{name:<30} transcript {mode} {latency * 1000:8.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
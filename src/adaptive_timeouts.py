@@ -0,0 +1,343 @@
+#!/usr/bin/python
+import atexit
+import bisect
+import logging
+import re
+import time
+from threading import Lock
+
+from cloudshell.cli.service.cli import CLI
+from cloudshell.cli.service.cli_service_impl import CliServiceImpl
+from cloudshell.cli.service.session_pool_context_manager import (
+    SessionPoolContextManager,
+)
+from cloudshell.cli.session.expect_session import ExpectSession
+from pysnmp.proto.api import v2c
+
+from state_storage import get_state_path, load_json_state, save_json_state
+
+from cloudshell.networking.cisco.cli.cisco_command_modes import ConfigCommandMode
+
+ADAPTIVE_TIMEOUTS_FILE = "adaptive_timeouts.json"
+CLI_PROTOCOL = "cli"
+SNMP_PROTOCOL = "snmp"
+COMMAND_CLASSES = (
+    ("copy", re.compile(r"^\s*(copy|archive|write|install|verify|squeeze)\b")),
+    ("show", re.compile(r"^\s*(show|dir|more|ping|traceroute)\b")),
+)
+SNMP_SEND_EXECPOINT = "rfc3412.sendPdu"
+SNMP_RESPONSE_EXECPOINT = "rfc3412.receiveMessage:response"
+
+
+def parse_timeout_bounds(value):
+    """Parse Adaptive Timeouts attribute value.
+
+    The value is comma separated "protocol=min-max" in seconds,
+    e.g. "cli=30-3600, snmp=2-30", protocols without bounds and "off"
+    use static timeouts.
+    :rtype: dict
+    """
+    bounds = {}
+    for item in filter(None, map(str.strip, (value or "").split(","))):
+        protocol, _, limits = item.partition("=")
+        minimum, _, maximum = limits.partition("-")
+        try:
+            minimum, maximum = float(minimum), float(maximum)
+        except ValueError:
+            continue
+        if 0 < minimum <= maximum:
+            bounds[protocol.strip().lower()] = minimum, maximum
+    return bounds
+
+
+def get_timeout_bounds(resource_config, protocol):
+    """Get (min, max) timeout bounds of the protocol or None if it's disabled."""
+    value = getattr(resource_config, "adaptive_timeouts", "")
+    return parse_timeout_bounds(value if isinstance(value, str) else "").get(protocol)
+
+
+def get_command_class(command, command_mode=None):
+    if isinstance(command_mode, ConfigCommandMode):
+        return f"{CLI_PROTOCOL}:config"
+    for name, pattern in COMMAND_CLASSES:
+        if command and pattern.match(command):
+            return f"{CLI_PROTOCOL}:{name}"
+    return f"{CLI_PROTOCOL}:other"
+
+
+def _get_bucket_boundaries(first, factor, buckets):
+    return [first * factor**i for i in range(buckets - 1)]
+
+
+class LatencyHistogram:
+    """Latency histogram with log-scale buckets.
+
+    Counts are halved when there are more than MAX_SAMPLES samples, so the
+    old samples fade out and the histogram follows the device.
+    """
+
+    FIRST_BUCKET = 0.05
+    BUCKET_FACTOR = 1.25
+    BUCKETS = 50
+    MAX_SAMPLES = 1000
+    BOUNDARIES = _get_bucket_boundaries(FIRST_BUCKET, BUCKET_FACTOR, BUCKETS)
+
+    def __init__(self, counts=None):
+        counts = list(counts or [])
+        self.counts = (counts + [0] * self.BUCKETS)[: self.BUCKETS]
+
+    @property
+    def samples(self):
+        return sum(self.counts)
+
+    @classmethod
+    def get_bucket(cls, latency):
+        return bisect.bisect_left(cls.BOUNDARIES, latency)
+
+    def add(self, latency):
+        self.counts[self.get_bucket(latency)] += 1
+        self._fade()
+
+    def merge(self, counts):
+        """Add the samples counted by the other histogram."""
+        self.counts = [count + other for count, other in zip(self.counts, counts)]
+        self._fade()
+
+    def _fade(self):
+        while self.samples > self.MAX_SAMPLES:
+            self.counts = [count // 2 for count in self.counts]
+
+    def percentile(self, percentile):
+        """Upper boundary of the bucket with the percentile."""
+        samples = self.samples
+        if not samples:
+            return None
+        rank = percentile * samples
+        total = 0
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= rank and count:
+                break
+        return self.FIRST_BUCKET * self.BUCKET_FACTOR**index
+
+
+class AdaptiveTimeouts:
+    """Per-device and command class timeouts learned from observed latency.
+
+    Timeout is the high percentile of the latency multiplied by the margin
+    factor plus the margin, bounded by the configured minimum and maximum.
+    Until there are MIN_SAMPLES samples the learned timeout can only extend
+    the static one. Histograms are persisted between driver restarts, the
+    samples added by the process are merged into the stored state.
+    """
+
+    PERCENTILE = 0.99
+    MARGIN_FACTOR = 1.5
+    MARGIN = 2
+    MIN_SAMPLES = 20
+    SAVE_INTERVAL = 30
+
+    def __init__(self, path=None):
+        self._path = path or get_state_path(ADAPTIVE_TIMEOUTS_FILE)
+        self._lock = Lock()
+        self._histograms = {}
+        # bucket counts of the samples recorded since the last save
+        self._increments = {}
+        self._saved = time.monotonic()
+        for device, histograms in load_json_state(self._path).items():
+            for command_class, counts in histograms.items():
+                self._histograms[(device, command_class)] = LatencyHistogram(counts)
+
+    def record(self, device, command_class, latency):
+        key = (device, command_class)
+        with self._lock:
+            histogram = self._histograms.setdefault(key, LatencyHistogram())
+            histogram.add(latency)
+            increments = self._increments.setdefault(
+                key, [0] * LatencyHistogram.BUCKETS
+            )
+            increments[LatencyHistogram.get_bucket(latency)] += 1
+            if time.monotonic() - self._saved > self.SAVE_INTERVAL:
+                self._save()
+
+    def get_timeout(self, device, command_class, default, minimum, maximum):
+        """Get the learned timeout or the default one, bounded by min and max."""
+        with self._lock:
+            histogram = self._histograms.get((device, command_class))
+            latency = histogram and histogram.percentile(self.PERCENTILE)
+            samples = histogram.samples if histogram else 0
+        if latency is None:
+            return default
+        timeout = latency * self.MARGIN_FACTOR + self.MARGIN
+        if samples < self.MIN_SAMPLES:
+            timeout = max(timeout, default)
+        return min(max(timeout, minimum), maximum)
+
+    def get_statistics(self, device):
+        with self._lock:
+            histograms = {
+                command_class: histogram
+                for (name, command_class), histogram in self._histograms.items()
+                if name == device
+            }
+            return {
+                command_class: {
+                    "samples": histogram.samples,
+                    "p50": histogram.percentile(0.5),
+                    "p99": histogram.percentile(self.PERCENTILE),
+                }
+                for command_class, histogram in histograms.items()
+            }
+
+    def flush(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        self._saved = time.monotonic()
+        if not self._increments:
+            return
+        state = load_json_state(self._path)
+        for (device, command_class), increments in self._increments.items():
+            device_state = state.setdefault(device, {})
+            histogram = LatencyHistogram(device_state.get(command_class))
+            histogram.merge(increments)
+            device_state[command_class] = histogram.counts
+        save_json_state(self._path, state)
+        self._increments.clear()
+        self._histograms = {
+            (device, command_class): LatencyHistogram(counts)
+            for device, histograms in state.items()
+            for command_class, counts in histograms.items()
+        }
+
+
+_adaptive_timeouts = None
+_adaptive_timeouts_lock = Lock()
+
+
+def get_adaptive_timeouts():
+    """Adaptive timeouts shared by all the resources of the driver process."""
+    global _adaptive_timeouts
+    with _adaptive_timeouts_lock:
+        if _adaptive_timeouts is None:
+            _adaptive_timeouts = AdaptiveTimeouts()
+            atexit.register(_adaptive_timeouts.flush)
+        return _adaptive_timeouts
+
+
+class AdaptiveTimeoutCliService(CliServiceImpl):
+    """CLI service sending commands with the timeouts learned for the device."""
+
+    def __init__(self, session, command_mode, logger, device, bounds, timeouts):
+        self._device = device
+        self._bounds = bounds
+        self._timeouts = timeouts
+        super().__init__(session, command_mode, logger)
+
+    def send_command(
+        self,
+        command,
+        expected_string=None,
+        action_map=None,
+        error_map=None,
+        logger=None,
+        remove_prompt=False,
+        *args,
+        **kwargs,
+    ):
+        """Send the command with the learned timeout.
+
+        Timeout passed by the caller is kept. Latency of the commands that
+        timed out isn't recorded, it's the timeout and not the device latency.
+        """
+        command_class = get_command_class(command, self.command_mode)
+        if not kwargs.get("timeout"):
+            default = (
+                getattr(self.session, "_timeout", None) or ExpectSession.READ_TIMEOUT
+            )
+            kwargs["timeout"] = self._timeouts.get_timeout(
+                self._device, command_class, default, *self._bounds
+            )
+        started = time.monotonic()
+        output = super().send_command(
+            command,
+            expected_string,
+            action_map,
+            error_map,
+            logger,
+            remove_prompt,
+            *args,
+            **kwargs,
+        )
+        self._timeouts.record(self._device, command_class, time.monotonic() - started)
+        return output
+
+
+class AdaptiveTimeoutSessionPoolContextManager(SessionPoolContextManager):
+    def __init__(self, *args, device, bounds, timeouts, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._device = device
+        self._bounds = bounds
+        self._timeouts = timeouts
+
+    def _initialize_cli_service(self, session, prompt):
+        def get_cli_service():
+            return AdaptiveTimeoutCliService(
+                session,
+                self._command_mode,
+                self._logger,
+                self._device,
+                self._bounds,
+                self._timeouts,
+            )
+
+        try:
+            return get_cli_service()
+        except Exception:
+            session.reconnect(prompt, self._logger)
+            return get_cli_service()
+
+
+class AdaptiveTimeoutCLI(CLI):
+    """CLI with per-device command timeouts learned from observed latency."""
+
+    def __init__(self, session_pool, device, bounds, timeouts=None):
+        super().__init__(session_pool=session_pool)
+        self._device = device
+        self._bounds = bounds
+        self._timeouts = timeouts or get_adaptive_timeouts()
+
+    def get_session(self, defined_sessions, command_mode, logger=None):
+        if not isinstance(defined_sessions, list):
+            defined_sessions = [defined_sessions]
+        return AdaptiveTimeoutSessionPoolContextManager(
+            self._session_pool,
+            defined_sessions,
+            command_mode,
+            logger or logging.getLogger("cloudshell_cli"),
+            device=self._device,
+            bounds=self._bounds,
+            timeouts=self._timeouts,
+        )
+
+
+def register_snmp_latency_observer(snmp_engine, device, timeouts):
+    """Record round trip time of the SNMP requests to the device."""
+    sent = {}
+
+    def on_send_pdu(engine, execpoint, variables, cb_ctx):
+        pdu = variables.get("pdu")
+        if pdu is not None:
+            sent[int(v2c.apiPDU.get_request_id(pdu))] = time.monotonic()
+
+    def on_response(engine, execpoint, variables, cb_ctx):
+        pdu = variables.get("pdu")
+        started = pdu is not None and sent.pop(
+            int(v2c.apiPDU.get_request_id(pdu)), None
+        )
+        if started:
+            timeouts.record(device, SNMP_PROTOCOL, time.monotonic() - started)
+
+    snmp_engine.observer.register_observer(on_send_pdu, SNMP_SEND_EXECPOINT)
+    snmp_engine.observer.register_observer(on_response, SNMP_RESPONSE_EXECPOINT)
@@ -0,0 +1,232 @@
+#!/usr/bin/python
+"""Asyncio facade of the Cisco IOS shell driver.
+
+CLI and SNMP libraries provide only blocking I/O, so the coroutines run the
+driver commands in a thread pool, each command in flight holds a worker
+thread. The facade bounds the number of threads, it doesn't make the I/O
+non-blocking.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from cloudshell.shell.core.driver_context import (
+    AutoLoadCommandContext,
+    AutoLoadDetails,
+    InitCommandContext,
+    ResourceCommandContext,
+)
+
+from driver import CiscoIOSShellDriver
+
+MAX_WORKERS = 64
+MAX_WORKERS_ENV = "CISCO_IOS_SHELL_ASYNC_WORKERS"
+
+_executor = None
+_locked_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_max_workers():
+    """Get the shared pool size, the environment variable overrides the default."""
+    try:
+        return max(int(os.environ.get(MAX_WORKERS_ENV) or MAX_WORKERS), 1)
+    except ValueError:
+        return MAX_WORKERS
+
+
+def get_shared_executor():
+    """Return process wide executor used by all async drivers.
+
+    Every command occupies a worker thread while it talks to the device.
+    Sharing one bounded pool between all the drivers keeps the number of
+    threads constant no matter how many routers are driven concurrently,
+    extra commands wait in the executor queue.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_max_workers(), thread_name_prefix="cisco-ios"
+            )
+        return _executor
+
+
+def get_locked_executor():
+    """Return process wide executor of the commands taking the GlobalLock.
+
+    The lock runs these commands one at a time, waiting for it in the shared
+    pool would hold its threads, so they get the one thread of their own.
+    """
+    global _locked_executor
+    with _executor_lock:
+        if _locked_executor is None:
+            _locked_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="cisco-ios-locked"
+            )
+        return _locked_executor
+
+
+class AsyncCiscoIOSShellDriver:
+    """Asyncio interface for the Cisco IOS shell driver.
+
+    Coroutines can be awaited from a single event loop for hundreds of routers,
+    e.g. asyncio.gather(*(driver.health_check(ctx) for driver, ctx in devices))
+    get_inventory, restore and load_firmware take the driver GlobalLock and
+    run in the locked executor.
+    """
+
+    def __init__(self, driver=None, executor=None, locked_executor=None):
+        self._driver = driver or CiscoIOSShellDriver()
+        self._executor = executor or get_shared_executor()
+        self._locked_executor = locked_executor or get_locked_executor()
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
+
+    async def _run_locked(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._locked_executor, partial(func, *args, **kwargs)
+        )
+
+    async def initialize(self, context: InitCommandContext) -> str:
+        return await self._run(self._driver.initialize, context)
+
+    async def get_inventory(self, context: AutoLoadCommandContext) -> AutoLoadDetails:
+        return await self._run_locked(self._driver.get_inventory, context)
+
+    async def run_custom_command(
+        self, context: ResourceCommandContext, custom_command: str
+    ) -> str:
+        return await self._run(self._driver.run_custom_command, context, custom_command)
+
+    async def run_custom_config_command(
+        self, context: ResourceCommandContext, custom_command: str
+    ) -> str:
+        return await self._run(
+            self._driver.run_custom_config_command, context, custom_command
+        )
+
+    async def ApplyConnectivityChanges(
+        self, context: ResourceCommandContext, request: str
+    ) -> str:
+        return await self._run(self._driver.ApplyConnectivityChanges, context, request)
+
+    async def save(
+        self,
+        context: ResourceCommandContext,
+        folder_path: str,
+        configuration_type: str,
+        vrf_management_name: str,
+    ) -> str:
+        return await self._run(
+            self._driver.save,
+            context,
+            folder_path=folder_path,
+            configuration_type=configuration_type,
+            vrf_management_name=vrf_management_name,
+        )
+
+    async def restore(
+        self,
+        context: ResourceCommandContext,
+        path: str,
+        configuration_type: str,
+        restore_method: str,
+        vrf_management_name: str,
+    ):
+        return await self._run_locked(
+            self._driver.restore,
+            context,
+            path=path,
+            configuration_type=configuration_type,
+            restore_method=restore_method,
+            vrf_management_name=vrf_management_name,
+        )
+
+    async def orchestration_save(
+        self, context: ResourceCommandContext, mode: str, custom_params: str
+    ) -> str:
+        return await self._run(
+            self._driver.orchestration_save, context, mode, custom_params
+        )
+
+    async def orchestration_save_fleet(
+        self,
+        context: ResourceCommandContext,
+        resource_names: str,
+        mode: str,
+        custom_params: str,
+        max_concurrency: str,
+        max_connections_per_server: str,
+    ) -> str:
+        return await self._run(
+            self._driver.orchestration_save_fleet,
+            context,
+            resource_names,
+            mode,
+            custom_params,
+            max_concurrency,
+            max_connections_per_server,
+        )
+
+    async def orchestration_restore(
+        self,
+        context: ResourceCommandContext,
+        saved_artifact_info: str,
+        custom_params: str,
+    ):
+        return await self._run(
+            self._driver.orchestration_restore,
+            context,
+            saved_artifact_info,
+            custom_params,
+        )
+
+    async def load_firmware(
+        self, context: ResourceCommandContext, path: str, vrf_management_name: str
+    ):
+        return await self._run_locked(
+            self._driver.load_firmware,
+            context,
+            path=path,
+            vrf_management_name=vrf_management_name,
+        )
+
+    async def load_firmware_fleet(
+        self,
+        context: ResourceCommandContext,
+        resource_names: str,
+        path: str,
+        vrf_management_name: str,
+        wave_size: str,
+        max_concurrency: str,
+        max_failures: str,
+        max_connections_per_server: str,
+    ) -> str:
+        return await self._run(
+            self._driver.load_firmware_fleet,
+            context,
+            resource_names,
+            path,
+            vrf_management_name,
+            wave_size,
+            max_concurrency,
+            max_failures,
+            max_connections_per_server,
+        )
+
+    async def health_check(self, context: ResourceCommandContext) -> str:
+        return await self._run(self._driver.health_check, context)
+
+    async def shutdown(self, context: ResourceCommandContext):
+        return await self._run(self._driver.shutdown, context)
+
+    def cleanup(self):
+        self._driver.cleanup()
@@ -0,0 +1,177 @@
+#!/usr/bin/python
+import time
+from functools import wraps
+from threading import Lock
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreakerOpenException(Exception):
+    """Device is unreachable, the command fails fast."""
+
+
+class CircuitBreaker:
+    """Per-device circuit breaker for the connections to the device.
+
+    Opens after failure_threshold connect failures in a row and rejects
+    the connections while open. After the backoff it's half-open and lets
+    one probe connection through: success closes it, failure opens it again
+    with the doubled backoff.
+    """
+
+    BASE_BACKOFF = 30
+    MAX_BACKOFF = 600
+
+    def __init__(
+        self,
+        device,
+        failure_threshold,
+        base_backoff=BASE_BACKOFF,
+        max_backoff=MAX_BACKOFF,
+    ):
+        self.device = device
+        self.failure_threshold = int(failure_threshold)
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._lock = Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._backoff = base_backoff
+        self._retry_at = 0.0
+        self._opened = None
+        self._probing = False
+        self._trips = 0
+        self._rejected = 0
+        self._total_failures = 0
+        self._total_successes = 0
+
+    @property
+    def enabled(self):
+        return self.failure_threshold > 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._get_state()
+
+    def _get_state(self):
+        if self._state == OPEN and time.monotonic() >= self._retry_at:
+            return HALF_OPEN
+        return self._state
+
+    def _reject(self):
+        self._rejected += 1
+        retry_in = max(self._retry_at - time.monotonic(), 0)
+        raise CircuitBreakerOpenException(
+            self.__class__.__name__,
+            f"Device {self.device} is unreachable, {self._failures} connect "
+            f"failures in a row, next connect attempt in {retry_in:.0f} sec",
+        )
+
+    def check(self):
+        """Fail fast if the circuit is open, doesn't take the probe slot."""
+        with self._lock:
+            if self.enabled and self._get_state() == OPEN:
+                self._reject()
+
+    def allow(self):
+        """Allow the connection, the only one while the circuit is half-open."""
+        with self._lock:
+            if not self.enabled:
+                return
+            state = self._get_state()
+            if state == OPEN or (state == HALF_OPEN and self._probing):
+                self._reject()
+            if state == HALF_OPEN:
+                self._state = HALF_OPEN
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self._total_successes += 1
+            self._state = CLOSED
+            self._failures = 0
+            self._backoff = self._base_backoff
+            self._opened = None
+            self._probing = False
+
+    def record_failure(self):
+        """Count the connect failure.
+
+        :return: True if the circuit was opened
+        """
+        with self._lock:
+            self._total_failures += 1
+            self._failures += 1
+            if not self.enabled:
+                return False
+            if self._state == HALF_OPEN:
+                self._backoff = min(self._backoff * 2, self._max_backoff)
+            elif self._failures < self.failure_threshold or self._state == OPEN:
+                return False
+            self._state = OPEN
+            self._probing = False
+            self._retry_at = time.monotonic() + self._backoff
+            self._opened = self._opened or time.time()
+            self._trips += 1
+            return True
+
+    def get_statistics(self):
+        with self._lock:
+            state = self._get_state()
+            return {
+                "state": state,
+                "failure_threshold": self.failure_threshold,
+                "consecutive_failures": self._failures,
+                "opened": self._opened,
+                "retry_in": (
+                    round(max(self._retry_at - time.monotonic(), 0), 1)
+                    if state == OPEN
+                    else 0
+                ),
+                "backoff": self._backoff,
+                "trips": self._trips,
+                "rejected": self._rejected,
+                "failures": self._total_failures,
+                "successes": self._total_successes,
+            }
+
+
+_circuit_breakers = {}
+_circuit_breakers_lock = Lock()
+
+
+def get_circuit_breaker(device, failure_threshold=None):
+    """Circuit breaker of the device shared by the resources of the process.
+
+    :param str device: device address
+    :param int failure_threshold: update the threshold of the breaker,
+        creates the breaker if it doesn't exist
+    :rtype: CircuitBreaker
+    """
+    with _circuit_breakers_lock:
+        circuit_breaker = _circuit_breakers.get(device)
+        if failure_threshold is None:
+            return circuit_breaker
+        if circuit_breaker is None:
+            circuit_breaker = _circuit_breakers[device] = CircuitBreaker(
+                device, failure_threshold
+            )
+        circuit_breaker.failure_threshold = int(failure_threshold)
+        return circuit_breaker
+
+
+def circuit_checked(func):
+    """Fail the driver command fast if the device's circuit is open."""
+
+    @wraps(func)
+    def _wrap_func(self, context, *args, **kwargs):
+        resource = getattr(context, "resource", None)
+        circuit_breaker = get_circuit_breaker(getattr(resource, "address", None))
+        if circuit_breaker is not None:
+            circuit_breaker.check()
+        return func(self, context, *args, **kwargs)
+
+    return _wrap_func
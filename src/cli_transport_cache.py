@@ -0,0 +1,236 @@
+#!/usr/bin/python
+import time
+from queue import Empty
+from threading import Lock
+
+from cloudshell.cli.service.cli import CLI
+from cloudshell.cli.service.session_manager_impl import (
+    SessionManagerException,
+    SessionManagerImpl,
+)
+from cloudshell.cli.service.session_pool_manager import SessionPoolManager
+
+from adaptive_timeouts import CLI_PROTOCOL, AdaptiveTimeoutCLI, get_timeout_bounds
+from circuit_breaker import get_circuit_breaker
+from session_leases import DeviceSessionLeases, LeasingSessionPoolManager
+from state_storage import get_state_path, load_json_state, save_json_state
+
+from cloudshell.networking.cisco.cisco_constants import DEFAULT_SESSION_POOL_TIMEOUT
+from cloudshell.networking.cisco.cli.cisco_cli_handler import CiscoCli
+
+TRANSPORT_CACHE_FILE = "cli_transports.json"
+
+
+def get_transport_id(session):
+    """Identify the session protocol, class and endpoint it connects to."""
+    transport_id = f"{type(session).__name__}@{session.host}:{session.port or ''}"
+    if getattr(session, "_start_with_new_line", False) is True:
+        transport_id += "/new_line"
+    return transport_id
+
+
+class CliTransportCache:
+    """Persisted per-device cache of the CLI transport that connected last time.
+
+    Entry of the device:
+        transport - transport id of the session that connected
+        failures - failed connections of the cached transport in a row
+        probe_time - time spent on the transports tried before it
+        hits - connections that used the cached transport first
+        saved_connect_time - probe time saved by the hits
+    """
+
+    MAX_FAILURES = 3
+    COUNTERS = ("hits", "saved_connect_time", "expired")
+
+    def __init__(self, path=None, max_failures=MAX_FAILURES):
+        self._path = path or get_state_path(TRANSPORT_CACHE_FILE)
+        self._max_failures = max_failures
+        self._lock = Lock()
+        self._entries = load_json_state(self._path)
+        self._increments = {}
+
+    def get_transport(self, device):
+        with self._lock:
+            return self._entries.get(device, {}).get("transport")
+
+    def record_success(self, device, transport_id, probe_time):
+        with self._lock:
+            entry = self._entries.setdefault(device, {})
+            if entry.get("transport") == transport_id:
+                self._increment(device, "hits", 1)
+                self._increment(device, "saved_connect_time", entry["probe_time"])
+            else:
+                entry.update(transport=transport_id, probe_time=probe_time)
+            entry["failures"] = 0
+            self._save(device)
+
+    def record_failure(self, device, transport_id):
+        """Count failure of the cached transport, expire it after max failures.
+
+        :return: True if the entry was expired
+        """
+        with self._lock:
+            entry = self._entries.get(device, {})
+            if entry.get("transport") != transport_id:
+                return False
+            entry["failures"] = entry.get("failures", 0) + 1
+            expired = entry["failures"] >= self._max_failures
+            if expired:
+                entry.update(transport=None, failures=0, probe_time=0.0)
+                self._increment(device, "expired", 1)
+            self._save(device)
+            return expired
+
+    def get_statistics(self, device=None):
+        with self._lock:
+            if device is not None:
+                return dict(self._entries.get(device, {}))
+            return {name: dict(entry) for name, entry in self._entries.items()}
+
+    def _increment(self, device, counter, value):
+        entry = self._entries[device]
+        entry[counter] = entry.get(counter, 0) + value
+        increments = self._increments.setdefault(device, {})
+        increments[counter] = increments.get(counter, 0) + value
+
+    def _save(self, device):
+        """Merge the device entry into the stored state.
+
+        Other processes update the same file, so the stored entries are
+        kept and only the counters incremented by this process are added.
+        """
+        state = load_json_state(self._path)
+        stored = state.get(device, {})
+        entry = dict(self._entries[device])
+        for counter, value in self._increments.pop(device, {}).items():
+            entry[counter] = stored.get(counter, 0) + value
+        state[device] = entry
+        save_json_state(self._path, state)
+        self._entries = state
+
+
+_transport_cache = None
+_transport_cache_lock = Lock()
+
+
+def get_transport_cache():
+    """Transport cache shared by all the resources of the driver process."""
+    global _transport_cache
+    with _transport_cache_lock:
+        if _transport_cache is None:
+            _transport_cache = CliTransportCache()
+        return _transport_cache
+
+
+class TransportCachingSessionManager(SessionManagerImpl):
+    """Try the transport that connected last time to the device first.
+
+    Connections are refused while the device's circuit breaker is open.
+    """
+
+    def __init__(self, transport_cache, circuit_breaker=None):
+        super().__init__()
+        self._transport_cache = transport_cache
+        self._circuit_breaker = circuit_breaker
+
+    def new_session(self, new_sessions, prompt, logger):
+        if self._circuit_breaker is None:
+            return self._connect(new_sessions, prompt, logger)
+
+        self._circuit_breaker.allow()
+        try:
+            session = self._connect(new_sessions, prompt, logger)
+        except Exception:
+            if self._circuit_breaker.record_failure():
+                logger.warning(
+                    f"Circuit breaker of {self._circuit_breaker.device} opened, "
+                    f"connections fail fast until the device recovers"
+                )
+            raise
+        self._circuit_breaker.record_success()
+        return session
+
+    def _connect(self, new_sessions, prompt, logger):
+        if not isinstance(new_sessions, list) or len(new_sessions) < 2:
+            return super().new_session(new_sessions, prompt, logger)
+
+        device = new_sessions[0].host
+        cached_transport = self._transport_cache.get_transport(device)
+        sessions = sorted(
+            new_sessions, key=lambda s: get_transport_id(s) != cached_transport
+        )
+        started = time.time()
+        for session in sessions:
+            transport_id = get_transport_id(session)
+            attempt_started = time.time()
+            try:
+                session = super().new_session(session, prompt, logger)
+            except Exception:
+                if transport_id == cached_transport and (
+                    self._transport_cache.record_failure(device, transport_id)
+                ):
+                    logger.info(f"Cached CLI transport {transport_id} expired")
+                continue
+            probe_time = attempt_started - started
+            self._transport_cache.record_success(device, transport_id, probe_time)
+            if transport_id == cached_transport:
+                logger.debug(f"Connected with cached CLI transport {transport_id}")
+            return session
+        raise SessionManagerException(
+            self.__class__.__name__,
+            "Failed to create new session for type {}, see logs for details".format(
+                ", ".join(session.session_type for session in sessions)
+            ),
+        )
+
+
+class CiscoIOSCli(CiscoCli):
+    def __init__(
+        self,
+        resource_config,
+        pool_timeout=DEFAULT_SESSION_POOL_TIMEOUT,
+        transport_cache=None,
+    ):
+        session_manager = TransportCachingSessionManager(
+            transport_cache or get_transport_cache(),
+            get_circuit_breaker(
+                resource_config.address, resource_config.circuit_breaker_threshold
+            ),
+        )
+        max_sessions = int(resource_config.sessions_concurrency_limit)
+        pool_kwargs = {
+            "session_manager": session_manager,
+            "max_pool_size": max_sessions,
+            "pool_timeout": pool_timeout,
+        }
+        if resource_config.global_sessions_limit:
+            leases = DeviceSessionLeases(resource_config.address, max_sessions)
+            session_pool = LeasingSessionPoolManager(leases, **pool_kwargs)
+        else:
+            session_pool = SessionPoolManager(**pool_kwargs)
+        self._session_pool = session_pool
+        timeout_bounds = get_timeout_bounds(resource_config, CLI_PROTOCOL)
+        if timeout_bounds:
+            self.cli = AdaptiveTimeoutCLI(
+                session_pool, resource_config.address, timeout_bounds
+            )
+        else:
+            self.cli = CLI(session_pool=session_pool)
+
+    def close(self, logger):
+        """Disconnect the sessions idle in the pool.
+
+        Sessions in use are removed when they are returned to the pool.
+        """
+        pool = self._session_pool._pool
+        while True:
+            try:
+                session = pool.get_nowait()
+            except Empty:
+                break
+            self._session_pool.remove_session(session, logger)
+            try:
+                session.disconnect()
+            except Exception:
+                logger.debug("Failed to disconnect the session", exc_info=True)
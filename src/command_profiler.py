@@ -0,0 +1,153 @@
+#!/usr/bin/python
+import cProfile
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from functools import wraps
+
+from resource_config import CiscoIOSResourceConfig
+from state_storage import get_state_dir
+from transcript_logging import TranscriptLoggingSessionContext
+
+PROFILING_ENV = "CISCO_IOS_SHELL_PROFILING_THRESHOLD"
+PROFILES_DIR_NAME = "profiles"
+
+# cProfile and tracemalloc are per process, profile one command at a time
+_profiling_lock = threading.Lock()
+
+
+def get_profiling_threshold(context):
+    """Get duration in seconds after which the command profile is saved.
+
+    Environment variable overrides the resource attribute.
+    :return: threshold, None if profiling is disabled
+    :rtype: float
+    """
+    try:
+        threshold = float(
+            os.environ.get(PROFILING_ENV)
+            or CiscoIOSResourceConfig.attribute_from_context(
+                context, "command_profiling_threshold"
+            )
+        )
+    except (TypeError, ValueError):
+        return None
+    return threshold if threshold > 0 else None
+
+
+def get_log_dir(logger):
+    """Directory of the log file the logger writes to."""
+    while logger:
+        for handler in logger.handlers:
+            file_name = getattr(handler, "baseFilename", None)
+            if file_name:
+                return os.path.dirname(file_name)
+        logger = logger.parent
+
+
+class CommandProfiler:
+    """Profile the command with cProfile and trace its memory allocations.
+
+    Profile of the command thread and allocations snapshot are kept only if
+    the command ran longer than the threshold.
+    """
+
+    TOP_ALLOCATIONS = 30
+    TRACEBACK_FRAMES = 10
+
+    def __init__(self, command, threshold):
+        self.command = command
+        self._threshold = threshold
+        self._profile = cProfile.Profile()
+        self._tracing = False
+        self.duration = None
+        self.snapshot = None
+
+    @property
+    def slow(self):
+        return self.duration is not None and self.duration >= self._threshold
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.TRACEBACK_FRAMES)
+            self._tracing = True
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._profile.disable()
+        self.duration = time.perf_counter() - self._started
+        if self.slow:
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+        if self._tracing:
+            tracemalloc.stop()
+        return False
+
+    def save(self, directory, prefix):
+        """Save the profile and top memory allocations.
+
+        :return: paths of the profile and of the allocations report
+        """
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        name = re.sub(r"[^\w.-]", "_", f"{prefix}--{self.command}--{timestamp}")
+        profile_path = os.path.join(directory, f"{name}.prof")
+        self._profile.dump_stats(profile_path)
+
+        memory_path = os.path.join(directory, f"{name}.memory.txt")
+        with open(memory_path, "w") as f:
+            f.write(f"{self.command} took {self.duration:.2f} sec\n")
+            if self.snapshot:
+                stats = self.snapshot.statistics("traceback")
+                total = sum(stat.size for stat in stats)
+                f.write(f"Allocated {total / 1024:.1f} KiB in {len(stats)} places\n")
+                for stat in stats[: self.TOP_ALLOCATIONS]:
+                    f.write(f"\n{stat}\n")
+                    f.writelines(f"    {line}\n" for line in stat.traceback.format())
+        return profile_path, memory_path
+
+
+def _save_profile(profiler, context):
+    logger = TranscriptLoggingSessionContext.get_logger_for_context(context)
+    log_dir = get_log_dir(logger) or os.path.join(get_state_dir(), PROFILES_DIR_NAME)
+    resource = getattr(context, "resource", None)
+    prefix = getattr(resource, "name", None) or "resource"
+    try:
+        paths = profiler.save(log_dir, prefix)
+    except OSError:
+        logger.exception(f"Failed to save profile of {profiler.command}")
+    else:
+        logger.warning(
+            f"{profiler.command} took {profiler.duration:.2f} sec, "
+            f"profile saved to {', '.join(paths)}"
+        )
+
+
+def profiled(func):
+    """Profile the driver command if profiling is enabled for the resource."""
+
+    @wraps(func)
+    def _wrap_func(self, context, *args, **kwargs):
+        threshold = get_profiling_threshold(context)
+        if threshold is None or not _profiling_lock.acquire(blocking=False):
+            return func(self, context, *args, **kwargs)
+        profiler = CommandProfiler(func.__name__, threshold)
+        try:
+            with profiler:
+                return func(self, context, *args, **kwargs)
+        finally:
+            _profiling_lock.release()
+            if profiler.slow:
+                try:
+                    _save_profile(profiler, context)
+                except Exception:
+                    logging.getLogger(__name__).exception("Failed to save profile")
+
+    return _wrap_func
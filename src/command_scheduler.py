@@ -0,0 +1,237 @@
+#!/usr/bin/python
+import threading
+import time
+from collections import OrderedDict, deque
+from enum import IntEnum
+from functools import wraps
+
+
+class CommandSchedulerException(Exception):
+    """Command scheduler exception."""
+
+
+class CommandPriority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+COMMAND_PRIORITIES = {
+    "health_check": CommandPriority.HIGH,
+    "run_custom_command": CommandPriority.HIGH,
+    "get_inventory": CommandPriority.NORMAL,
+    "run_custom_config_command": CommandPriority.NORMAL,
+    "ApplyConnectivityChanges": CommandPriority.NORMAL,
+    "shutdown": CommandPriority.NORMAL,
+    "save": CommandPriority.LOW,
+    "restore": CommandPriority.LOW,
+    "orchestration_save": CommandPriority.LOW,
+    "orchestration_restore": CommandPriority.LOW,
+    "load_firmware": CommandPriority.LOW,
+}
+
+
+class _Ticket:
+    __slots__ = ("command", "priority", "reservation_id", "enqueued")
+
+    def __init__(self, command, priority, reservation_id):
+        self.command = command
+        self.priority = priority
+        self.reservation_id = reservation_id
+        self.enqueued = time.time()
+
+
+class CommandScheduler:
+    """Per-device command scheduler.
+
+    Limits the number of commands executed at the same time to the sessions
+    concurrency limit of the device. Waiting commands are dispatched by priority,
+    commands with the same priority are dispatched round-robin across
+    reservations, so one reservation can't starve the others.
+    """
+
+    STATISTICS_WINDOW = 100
+
+    def __init__(self, max_concurrency=1, queue_timeout=300):
+        """Command scheduler.
+
+        :param int max_concurrency: number of commands executed simultaneously
+        :param int queue_timeout: max time in seconds a command waits in the queue
+        """
+        self._max_concurrency = max(int(max_concurrency), 1)
+        self._queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self._queues = {priority: OrderedDict() for priority in CommandPriority}
+        self._running = 0
+        self._wait_times = deque(maxlen=self.STATISTICS_WINDOW)
+        self._service_times = deque(maxlen=self.STATISTICS_WINDOW)
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
+
+    def schedule(self, command, reservation_id="", timeout=None):
+        """Return context manager which holds a slot while the command runs.
+
+        :param str command: driver command name
+        :param str reservation_id: reservation the command was executed from
+        :param int timeout: max time in seconds to wait for the slot
+        """
+        return _ScheduledCommand(self, command, reservation_id, timeout)
+
+    def get_statistics(self):
+        """Return queue depth and wait time statistics.
+
+        :rtype: dict
+        """
+        with self._condition:
+            wait_times = list(self._wait_times)
+            return {
+                "max_concurrency": self._max_concurrency,
+                "running": self._running,
+                "queue_depth": self._queue_depth(),
+                "queue_depth_by_priority": {
+                    priority.name.lower(): sum(map(len, queue.values()))
+                    for priority, queue in self._queues.items()
+                },
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "avg_wait_time": _average(wait_times),
+                "max_wait_time": max(wait_times) if wait_times else 0.0,
+                "avg_service_time": _average(self._service_times),
+            }
+
+    def _acquire(self, command, reservation_id, timeout):
+        if timeout is None:
+            timeout = self._queue_timeout
+        priority = COMMAND_PRIORITIES.get(command, CommandPriority.NORMAL)
+
+        with self._condition:
+            estimated_wait = self._estimate_wait(priority)
+            if estimated_wait > timeout:
+                self._rejected += 1
+                raise CommandSchedulerException(
+                    self.__class__.__name__,
+                    "Command '{}' rejected, estimated queue wait {:.0f} sec "
+                    "exceeds {} sec".format(command, estimated_wait, timeout),
+                )
+
+            ticket = _Ticket(command, priority, reservation_id)
+            self._queues[priority].setdefault(reservation_id, deque()).append(ticket)
+            deadline = ticket.enqueued + timeout
+            while not (
+                self._running < self._max_concurrency and self._next_ticket() is ticket
+            ):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self._remove(ticket)
+                    self._timed_out += 1
+                    self._condition.notify_all()
+                    raise CommandSchedulerException(
+                        self.__class__.__name__,
+                        "Command '{}' didn't get a session slot during {} sec".format(
+                            command, timeout
+                        ),
+                    )
+                self._condition.wait(remaining)
+
+            self._dispatch(ticket)
+            self._running += 1
+            # the next ticket may be dispatched if there is another free slot
+            self._condition.notify_all()
+            started = time.time()
+            self._wait_times.append(started - ticket.enqueued)
+            return started
+
+    def _release(self, started):
+        with self._condition:
+            self._running -= 1
+            self._completed += 1
+            self._service_times.append(time.time() - started)
+            self._condition.notify_all()
+
+    def _estimate_wait(self, priority):
+        """Estimate queue wait based on the recent command execution times."""
+        if not self._service_times:
+            return 0.0
+        ahead = sum(
+            sum(map(len, queue.values()))
+            for queue_priority, queue in self._queues.items()
+            if queue_priority <= priority
+        )
+        rounds = (ahead + self._running) // self._max_concurrency
+        return rounds * _average(self._service_times)
+
+    def _queue_depth(self):
+        return sum(sum(map(len, queue.values())) for queue in self._queues.values())
+
+    def _next_ticket(self):
+        for priority in CommandPriority:
+            queue = self._queues[priority]
+            if queue:
+                return next(iter(queue.values()))[0]
+
+    def _dispatch(self, ticket):
+        """Remove the ticket from the queue, move its reservation to the end."""
+        queue = self._queues[ticket.priority]
+        tickets = queue.pop(ticket.reservation_id)
+        tickets.popleft()
+        if tickets:
+            queue[ticket.reservation_id] = tickets
+
+    def _remove(self, ticket):
+        queue = self._queues[ticket.priority]
+        tickets = queue[ticket.reservation_id]
+        tickets.remove(ticket)
+        if not tickets:
+            del queue[ticket.reservation_id]
+
+
+class _ScheduledCommand:
+    def __init__(self, scheduler, command, reservation_id, timeout):
+        self._scheduler = scheduler
+        self._command = command
+        self._reservation_id = reservation_id
+        self._timeout = timeout
+        self._started = None
+
+    def __enter__(self):
+        self._started = self._scheduler._acquire(
+            self._command, self._reservation_id, self._timeout
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._scheduler._release(self._started)
+        return False
+
+
+def get_reservation_id(context):
+    try:
+        # reservation context not present in Autoload context
+        return context.reservation.reservation_id or ""
+    except AttributeError:
+        return ""
+
+
+def scheduled(func):
+    """Run driver command in the slot of the driver's command scheduler."""
+
+    @wraps(func)
+    def _wrap_func(self, context, *args, **kwargs):
+        scheduler = getattr(self, "_scheduler", None)
+        if scheduler is None:
+            return func(self, context, *args, **kwargs)
+        with scheduler.schedule(func.__name__, get_reservation_id(context)):
+            return func(self, context, *args, **kwargs)
+
+    return _wrap_func
+
+
+def _average(values):
+    values = list(values)
+    return sum(values) / len(values) if values else 0.0
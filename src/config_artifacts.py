@@ -0,0 +1,91 @@
+#!/usr/bin/python
+import ftplib
+import hashlib
+import io
+import time
+from pathlib import PurePosixPath
+from threading import Lock
+
+from state_storage import get_state_path, load_json_state, save_json_state
+
+CONFIG_DIGESTS_FILE = "saved_config_digests.json"
+MAX_CONFIG_DIGESTS = 10000
+_config_digests_lock = Lock()
+
+
+class ConfigArtifactStore:
+    """Access configuration files saved by the device on the FTP server."""
+
+    SUPPORTED_SCHEMES = {"ftp"}
+    TIMEOUT = 60
+
+    def __init__(self, url, timeout=TIMEOUT):
+        """Config artifact store.
+
+        :param cloudshell.shell.flows.utils.url.RemoteURL url: url of the file
+            or the folder on the server
+        :param int timeout: connection timeout
+        """
+        self._url = url
+        self._timeout = timeout
+        self._ftp = None
+
+    @classmethod
+    def is_supported(cls, url):
+        return getattr(url, "scheme", "") in cls.SUPPORTED_SCHEMES
+
+    def __enter__(self):
+        self._ftp = ftplib.FTP(timeout=self._timeout)
+        self._ftp.connect(self._url.host, self._url.port or ftplib.FTP_PORT)
+        self._ftp.login(self._url.username or "anonymous", self._url.password or "")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self._ftp.quit()
+        except Exception:
+            self._ftp.close()
+        return False
+
+    def _get_path(self, filename):
+        return str(PurePosixPath(self._url.get_folder()) / filename)
+
+    def read(self, filename):
+        buffer = io.BytesIO()
+        self._ftp.retrbinary(f"RETR {self._get_path(filename)}", buffer.write)
+        return buffer.getvalue()
+
+
+def get_artifact_key(url):
+    """Key of the file on the server."""
+    path = PurePosixPath(url.get_folder() or "/") / url.filename
+    return f"{url.scheme}://{(url.host or '').lower()}{path}"
+
+
+def get_config_digest(data):
+    return {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def record_config_digest(url, data, path=None):
+    """Remember size and hash of the saved config to verify it before restore.
+
+    :param url: saved config url
+    :param bytes data: saved config
+    :param str path: state file path
+    """
+    path = path or get_state_path(CONFIG_DIGESTS_FILE)
+    digest = dict(get_config_digest(data), saved=time.time())
+    with _config_digests_lock:
+        digests = load_json_state(path)
+        digests[get_artifact_key(url)] = digest
+        if len(digests) > MAX_CONFIG_DIGESTS:
+            oldest = sorted(digests, key=lambda key: digests[key].get("saved", 0))
+            for key in oldest[: len(digests) - MAX_CONFIG_DIGESTS]:
+                del digests[key]
+        save_json_state(path, digests)
+
+
+def load_config_digest(url, path=None):
+    """Get the recorded digest of the saved config or None if it's unknown."""
+    path = path or get_state_path(CONFIG_DIGESTS_FILE)
+    return load_json_state(path).get(get_artifact_key(url))
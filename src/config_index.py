@@ -0,0 +1,217 @@
+#!/usr/bin/python
+import re
+import sqlite3
+import time
+from contextlib import closing
+
+from config_artifacts import ConfigArtifactStore, record_config_digest
+from state_storage import get_state_path
+
+INDEX_FILE_NAME = "saved_configs_index.sqlite"
+SKIPPED_LINE_PATTERN = re.compile(
+    r"^(!.*|end|Building configuration.*|Current configuration\s*:.*)$"
+)
+BANNER_PATTERN = re.compile(r"^banner \S+ (?P<delimiter>\^C|\S)(?P<text>.*)$")
+WILDCARD_PATTERN = re.compile(r"[*?\[]")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    id INTEGER PRIMARY KEY,
+    resource TEXT NOT NULL,
+    configuration_type TEXT NOT NULL,
+    address TEXT,
+    file_name TEXT NOT NULL,
+    saved REAL NOT NULL,
+    UNIQUE (resource, configuration_type)
+);
+CREATE TABLE IF NOT EXISTS lines (
+    config_id INTEGER NOT NULL REFERENCES configs (id) ON DELETE CASCADE,
+    section TEXT NOT NULL,
+    line TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lines_line ON lines (line);
+CREATE INDEX IF NOT EXISTS lines_section ON lines (section);
+CREATE INDEX IF NOT EXISTS lines_config ON lines (config_id);
+"""
+
+
+def parse_config_sections(text):
+    """Split IOS config into the top level sections.
+
+    A top level line starts the section, indented lines and banner text
+    belong to it. Comments, blank lines and the config header are skipped.
+    :return: list of (section, line), the section header has itself as section
+    :rtype: list[tuple[str, str]]
+    """
+    result = []
+    section = None
+    banner_delimiter = None
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if banner_delimiter:
+            if banner_delimiter in line:
+                line = line.split(banner_delimiter, 1)[0].strip()
+                banner_delimiter = None
+            if line:
+                result.append((section, line))
+            continue
+        if not line or SKIPPED_LINE_PATTERN.match(line):
+            continue
+        if raw_line[0].isspace() and section:
+            result.append((section, line))
+            continue
+        section = line
+        result.append((section, line))
+        match = BANNER_PATTERN.match(line)
+        if match and match.group("delimiter") not in match.group("text"):
+            banner_delimiter = match.group("delimiter")
+    return result
+
+
+def _to_glob(pattern):
+    """Exact match for the plain text, GLOB match for the wildcards."""
+    if WILDCARD_PATTERN.search(pattern):
+        return "GLOB", pattern
+    return "=", pattern
+
+
+class SavedConfigsIndex:
+    """Inverted index of the saved configs by config line and section.
+
+    The last saved config of each resource and configuration type is indexed,
+    a new save of the resource replaces its lines. The index is a sqlite
+    database shared by the driver processes, lines and sections are B-tree
+    indexed, so exact and prefix (e.g. "ntp server *") queries don't scan
+    the configs.
+    """
+
+    def __init__(self, path=None):
+        self._path = path or get_state_path(INDEX_FILE_NAME)
+        with closing(self._connect()) as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self._path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    def add_config(
+        self, resource, configuration_type, file_name, text, address=None, saved=None
+    ):
+        """Index the saved config, replacing the previous one of the resource.
+
+        :return: number of indexed lines
+        """
+        lines = parse_config_sections(text)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "DELETE FROM configs WHERE resource = ? AND configuration_type = ?",
+                (resource, configuration_type),
+            )
+            cursor = connection.execute(
+                "INSERT INTO configs "
+                "(resource, configuration_type, address, file_name, saved) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    resource,
+                    configuration_type,
+                    address,
+                    file_name,
+                    saved or time.time(),
+                ),
+            )
+            config_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO lines (config_id, section, line) VALUES (?, ?, ?)",
+                ((config_id, section, line) for section, line in lines),
+            )
+        return len(lines)
+
+    def remove_config(self, resource, configuration_type=None):
+        query = "DELETE FROM configs WHERE resource = ?"
+        params = [resource]
+        if configuration_type:
+            query += " AND configuration_type = ?"
+            params.append(configuration_type)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(query, params)
+
+    def query(self, line=None, section=None, configuration_type="running", limit=100):
+        """Find the resources with matching config lines.
+
+        :param str line: config line, exact or with GLOB wildcards "*?[]"
+        :param str section: top level section, exact or with GLOB wildcards
+        :param str configuration_type: running or startup, None for both
+        :param int limit: max matched lines returned per resource
+        :return: matched resources with their matched lines
+        :rtype: list[dict]
+        """
+        if not line and not section:
+            return []
+        conditions = []
+        params = []
+        if line:
+            operator, value = _to_glob(line.strip())
+            conditions.append(f"lines.line {operator} ?")
+            params.append(value)
+        if section:
+            operator, value = _to_glob(section.strip())
+            conditions.append(f"lines.section {operator} ?")
+            params.append(value)
+        if configuration_type:
+            conditions.append("configs.configuration_type = ?")
+            params.append(configuration_type.lower())
+
+        sql = (
+            "SELECT configs.resource, configs.configuration_type, configs.address, "
+            "configs.file_name, configs.saved, lines.section, lines.line "
+            "FROM lines JOIN configs ON configs.id = lines.config_id "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY configs.resource, configs.configuration_type, lines.rowid"
+        )
+        results = {}
+        with closing(self._connect()) as connection:
+            for row in connection.execute(sql, params):
+                resource, conf_type, address, file_name, saved, sect, text = row
+                result = results.get((resource, conf_type))
+                if result is None:
+                    result = results[(resource, conf_type)] = {
+                        "resource": resource,
+                        "configuration_type": conf_type,
+                        "address": address,
+                        "file_name": file_name,
+                        "saved": saved,
+                        "matches": [],
+                    }
+                if len(result["matches"]) < limit:
+                    result["matches"].append({"section": sect, "line": text})
+        return list(results.values())
+
+
+def index_saved_config(url, resource_config, configuration_type, logger, index=None):
+    """Read the saved config back from the server and index it.
+
+    :param cloudshell.shell.flows.utils.url.RemoteURL url: saved config url
+    :return: True if the config was indexed
+    """
+    if not ConfigArtifactStore.is_supported(url):
+        logger.debug(f"Saved configs on {url.scheme} servers aren't indexed")
+        return False
+    started = time.time()
+    with ConfigArtifactStore(url) as store:
+        data = store.read(url.filename)
+    record_config_digest(url, data)
+    index = index or SavedConfigsIndex()
+    lines_count = index.add_config(
+        resource_config.name,
+        getattr(configuration_type, "value", configuration_type).lower(),
+        url.filename,
+        data.decode("utf-8", errors="replace"),
+        address=resource_config.address,
+    )
+    logger.info(
+        f"Indexed {lines_count} lines of {url.filename} "
+        f"in {time.time() - started:.2f} sec"
+    )
+    return True
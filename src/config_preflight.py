@@ -0,0 +1,122 @@
+#!/usr/bin/python
+import re
+import time
+
+from config_artifacts import ConfigArtifactStore, get_config_digest, load_config_digest
+
+HOSTNAME_PATTERN = re.compile(r"^hostname\s+(?P<hostname>\S+)\s*$", re.MULTILINE)
+VERSION_PATTERN = re.compile(r"^version\s+(?P<version>\S+)\s*$", re.MULTILINE)
+MAJOR_VERSION_PATTERN = re.compile(r"(?P<major>\d+)\.\d+")
+END_MARKER = "end"
+
+
+class ConfigPreflightException(Exception):
+    """The config failed the checks before restore."""
+
+
+def get_major_version(version):
+    match = MAJOR_VERSION_PATTERN.search(version or "")
+    return match and match.group("major")
+
+
+def check_config(data, system_name="", os_version="", digest=None, full_config=True):
+    """Check the config file before restoring it to the device.
+
+    :param bytes data: config
+    :param str system_name: device host name found by the autoload
+    :param str os_version: device OS version found by the autoload
+    :param dict digest: size and hash recorded when the config was saved
+    :param bool full_config: check end marker, hostname and version headers,
+        config snippets restored with append method don't have them
+    :return: problems found, empty if the config can be restored
+    :rtype: list[str]
+    """
+    if not data.strip():
+        return ["config is empty"]
+    problems = []
+    if digest and get_config_digest(data) != {
+        "size": digest.get("size"),
+        "sha256": digest.get("sha256"),
+    }:
+        problems.append(
+            f"size or hash differs from the saved config, {len(data)} bytes "
+            f"instead of {digest.get('size')}"
+        )
+    if b"\x00" in data:
+        return problems + ["config isn't a text file"]
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return problems + ["config isn't a text file"]
+    if not full_config:
+        return problems
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines or lines[-1] != END_MARKER:
+        problems.append(f"config is truncated, it doesn't end with '{END_MARKER}'")
+
+    hostname = HOSTNAME_PATTERN.search(text)
+    device_hostname = system_name.split(".")[0]
+    if (
+        hostname
+        and device_hostname
+        and hostname.group("hostname").lower() != device_hostname.lower()
+    ):
+        problems.append(
+            f"config is for host {hostname.group('hostname')}, "
+            f"the device is {device_hostname}"
+        )
+
+    version = VERSION_PATTERN.search(text)
+    config_major = version and get_major_version(version.group("version"))
+    device_major = get_major_version(os_version)
+    if config_major and device_major and config_major != device_major:
+        problems.append(
+            f"config is for version {version.group('version')}, "
+            f"the device runs {os_version}"
+        )
+    return problems
+
+
+def preflight_config(url, resource_config, logger, full_config=True):
+    """Read the config from the server and check it against the device facts.
+
+    Facts are the System Name and OS Version attributes set by the autoload,
+    the device isn't touched.
+    :param cloudshell.shell.flows.utils.url.RemoteURL url: config url
+    :param bool full_config: False for config snippets restored with append
+    :return: True if the config was checked, False if it can't be read
+    :raise ConfigPreflightException: the config can't be restored
+    """
+    if not ConfigArtifactStore.is_supported(url):
+        logger.debug(f"Configs on {url.scheme} servers aren't checked before restore")
+        return False
+
+    started = time.time()
+    try:
+        with ConfigArtifactStore(url) as store:
+            data = store.read(url.filename)
+    except Exception:
+        # the driver host may not reach the server the device uses
+        logger.warning(
+            f"Unable to read config {url.filename}, restoring it unchecked",
+            exc_info=True,
+        )
+        return False
+
+    problems = check_config(
+        data,
+        getattr(resource_config, "system_name", "") or "",
+        getattr(resource_config, "os_version", "") or "",
+        load_config_digest(url),
+        full_config,
+    )
+    if problems:
+        raise ConfigPreflightException(
+            "preflight_config",
+            f"Config {url.filename} can't be restored: {'; '.join(problems)}",
+        )
+    logger.info(
+        f"Config {url.filename} passed checks in {time.time() - started:.2f} sec"
+    )
+    return True
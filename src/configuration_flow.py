@@ -0,0 +1,167 @@
+#!/usr/bin/python
+import re
+from contextlib import nullcontext
+from copy import copy
+from threading import Lock
+
+from cloudshell.shell.flows.configuration.basic_flow import (
+    ConfigurationType,
+    RestoreMethod,
+)
+
+from config_index import index_saved_config
+from config_preflight import preflight_config
+
+from cloudshell.networking.cisco.flows.cisco_configuration_flow import (
+    CiscoConfigurationFlow,
+)
+
+
+class SavedConfigsCache:
+    """Last saved running config of the devices and its change marker."""
+
+    def __init__(self):
+        self._saved = {}
+        self._last_saves = {}
+        self._lock = Lock()
+
+    def get(self, key, marker):
+        """Return saved file name if the config wasn't changed since it was saved."""
+        with self._lock:
+            saved_marker, file_name = self._saved.get(key, (None, None))
+        if saved_marker == marker:
+            return file_name
+
+    def set(self, key, marker, file_name):
+        with self._lock:
+            self._saved[key] = (marker, file_name)
+
+    def set_last_save(self, address, file_name, skipped):
+        """Record the result of the last save of the device."""
+        with self._lock:
+            self._last_saves[address] = {"file_name": file_name, "skipped": skipped}
+
+    def get_last_save(self, address):
+        """Return the result of the last save of the device or None."""
+        with self._lock:
+            last_save = self._last_saves.get(address)
+        return dict(last_save) if last_save else None
+
+
+SAVED_CONFIGS = SavedConfigsCache()
+
+
+class CiscoIOSConfigurationFlow(CiscoConfigurationFlow):
+    LAST_CHANGE_COMMAND = "show running-config | include Last configuration change"
+    LAST_CHANGE_PATTERN = re.compile(r"Last configuration change at (?P<marker>.+)")
+
+    def __init__(self, cli_handler, resource_config, logger, transfer_slot=None):
+        """Configuration flow.
+
+        :param transfer_slot: context manager held while the config is
+            transferred to the server, limits simultaneous transfers
+        """
+        super().__init__(cli_handler, resource_config, logger)
+        self.save_skipped = False
+        self._transfer_slot = transfer_slot or nullcontext()
+
+    def _save_flow(self, folder_path, configuration_type, vrf_management_name=None):
+        """Save the config.
+
+        Running config isn't copied if it wasn't changed since the last save
+        to the same location, the previously saved file name is returned.
+        Whether the save was skipped is recorded in SAVED_CONFIGS last saves.
+        New saved config is added to the saved configs index if it's enabled.
+
+        :return: saved configuration file name if it was changed
+        """
+        self.save_skipped = False
+        marker = key = None
+        if self._can_skip_unchanged(configuration_type):
+            marker = self._get_last_change_marker()
+            key = self._get_saved_config_key(folder_path, vrf_management_name)
+            saved_file_name = marker and SAVED_CONFIGS.get(key, marker)
+            if saved_file_name:
+                self._logger.info(
+                    f"Running config wasn't changed since {marker}, "
+                    f"save skipped, using {saved_file_name}"
+                )
+                self.save_skipped = True
+                SAVED_CONFIGS.set_last_save(
+                    self._resource_config.address, saved_file_name, True
+                )
+                return saved_file_name
+
+        with self._transfer_slot:
+            new_file_name = super()._save_flow(
+                folder_path, configuration_type, vrf_management_name
+            )
+            if getattr(self._resource_config, "index_saved_configs", False):
+                self._index_saved_config(folder_path, new_file_name, configuration_type)
+        file_name = new_file_name or folder_path.filename
+        if marker:
+            SAVED_CONFIGS.set(key, marker, file_name)
+        SAVED_CONFIGS.set_last_save(self._resource_config.address, file_name, False)
+        return new_file_name
+
+    def _index_saved_config(self, folder_path, new_file_name, configuration_type):
+        """Add the saved config to the saved configs index, never fail the save."""
+        saved_url = copy(folder_path)
+        if new_file_name:
+            saved_url.replace_filename(new_file_name)
+        try:
+            index_saved_config(
+                saved_url, self._resource_config, configuration_type, self._logger
+            )
+        except Exception:
+            self._logger.warning(
+                f"Failed to index saved config {saved_url.filename}", exc_info=True
+            )
+
+    def _can_skip_unchanged(self, configuration_type):
+        return configuration_type == ConfigurationType.RUNNING and getattr(
+            self._resource_config, "skip_unchanged_save", False
+        )
+
+    def _get_last_change_marker(self):
+        """Get the time of the last running config change or None if it's unknown.
+
+        The device builds the whole running config to filter the line, it
+        costs an extra running config read before each save.
+        """
+        with self._cli_handler.get_cli_service(
+            self._cli_handler.enable_mode
+        ) as enable_session:
+            output = enable_session.send_command(self.LAST_CHANGE_COMMAND)
+        match = self.LAST_CHANGE_PATTERN.search(output)
+        if match:
+            return match.group("marker").strip()
+
+    def _get_saved_config_key(self, folder_path, vrf_management_name):
+        return (
+            self._resource_config.address,
+            folder_path.scheme,
+            getattr(folder_path, "host", ""),
+            folder_path.get_folder(),
+            vrf_management_name,
+        )
+
+    def _restore_flow(
+        self, path, configuration_type, restore_method, vrf_management_name
+    ):
+        """Restore the config.
+
+        The config is checked before restore if Restore Preflight is set,
+        snippets restored with append method are only checked for integrity.
+        """
+        if getattr(self._resource_config, "restore_preflight", False):
+            preflight_config(
+                path,
+                self._resource_config,
+                self._logger,
+                full_config=restore_method != RestoreMethod.APPEND,
+            )
+
+        return super()._restore_flow(
+            path, configuration_type, restore_method, vrf_management_name
+        )
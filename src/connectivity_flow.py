@@ -0,0 +1,140 @@
+#!/usr/bin/python
+import re
+import time
+from threading import Lock
+
+from cloudshell.cli.command_template.command_template import CommandTemplate
+from cloudshell.cli.command_template.command_template_executor import (
+    CommandTemplateExecutor,
+)
+from cloudshell.snmp.autoload.helper.port_name_helper import convert_port_name
+
+from cloudshell.networking.cisco.command_actions.iface_actions import IFaceActions
+from cloudshell.networking.cisco.flows.cisco_connectivity_flow import (
+    CiscoConnectivityFlow,
+)
+
+SHOW_INTERFACES_BRIEF = CommandTemplate("do show ip interface brief")
+INTERFACE_PATTERN = re.compile(r"^(?P<name>\S+)\s+\S+\s+(?:YES|NO)\s", re.MULTILINE)
+# created by the connectivity flow, missing on the device until then
+CREATED_INTERFACE_PATTERN = re.compile(r"^port-channel", re.IGNORECASE)
+
+
+def get_interface_key(name):
+    """Port resource name the autoload builds for the interface, lower case."""
+    return convert_port_name(name).lower()
+
+
+class InterfaceNameIndex:
+    """Interface names of the device by the names of its port resources.
+
+    Built from one bulk read of the device interfaces. It's reloaded when
+    it's older than MAX_AGE, so deleted interfaces don't stay in it, and
+    when the port isn't found, at most once per MIN_REFRESH_INTERVAL.
+    Concurrent misses are resolved with one refresh.
+    """
+
+    MAX_AGE = 300
+    MIN_REFRESH_INTERVAL = 30
+
+    def __init__(self):
+        self._names = {}
+        self._loaded = None
+        self._generation = 0
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+
+    def resolve(self, port, load_interfaces, refresh=True):
+        """Get interface name of the port resource.
+
+        :param str port: port resource full name or name
+        :param load_interfaces: callable() -> list of the device interface names
+        :param bool refresh: refresh the index if the port isn't found, it's
+            loaded anyway if it's empty or expired
+        :return: interface name or None if the device doesn't have it
+        :rtype: str
+        """
+        key = get_interface_key(port.split("/")[-1])
+        with self._lock:
+            name = self._names.get(key)
+            generation = self._generation
+            age = time.time() - self._loaded if generation else None
+        if (
+            age is None
+            or age > self.MAX_AGE
+            or (name is None and refresh and age >= self.MIN_REFRESH_INTERVAL)
+        ):
+            self._refresh(generation, load_interfaces)
+            with self._lock:
+                name = self._names.get(key)
+        return name
+
+    def _refresh(self, generation, load_interfaces):
+        with self._refresh_lock:
+            if generation != self._generation:
+                # refreshed by another thread while this one was waiting
+                return
+            names = {get_interface_key(name): name for name in load_interfaces()}
+            with self._lock:
+                self._names = names
+                self._loaded = time.time()
+                self._generation += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._names)
+
+
+_interface_indexes = {}
+_interface_indexes_lock = Lock()
+
+
+def get_interface_index(device):
+    """Interface name index of the device shared by the resources of the process.
+
+    :param str device: device address
+    :rtype: InterfaceNameIndex
+    """
+    with _interface_indexes_lock:
+        return _interface_indexes.setdefault(device, InterfaceNameIndex())
+
+
+class CiscoIOSIFaceActions(IFaceActions):
+    def __init__(self, cli_service, logger, interface_index):
+        super().__init__(cli_service, logger)
+        self._interface_index = interface_index
+
+    def get_interfaces(self):
+        output = CommandTemplateExecutor(
+            self._cli_service, SHOW_INTERFACES_BRIEF
+        ).execute_command()
+        return [match.group("name") for match in INTERFACE_PATTERN.finditer(output)]
+
+    def get_port_name(self, port):
+        """Get interface name of the port resource from the interface index.
+
+        Falls back to the name built from the port resource name if the
+        device doesn't have the interface, e.g. a new port-channel. The index
+        isn't refreshed for port-channels, they are missing until created.
+        """
+        port_name = super().get_port_name(port)
+        name = self._interface_index.resolve(
+            port,
+            self.get_interfaces,
+            refresh=not CREATED_INTERFACE_PATTERN.match(port_name),
+        )
+        if name is None:
+            self._logger.warning(
+                f"Interface {port_name} isn't found on the device, using it as is"
+            )
+            return port_name
+        return name
+
+
+class CiscoIOSConnectivityFlow(CiscoConnectivityFlow):
+    def __init__(self, cli_handler, logger, interface_index, **kwargs):
+        super().__init__(cli_handler, logger, **kwargs)
+        self._interface_index = interface_index
+
+    def _get_iface_actions(self, config_session):
+        return CiscoIOSIFaceActions(config_session, self._logger, self._interface_index)
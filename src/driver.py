@@ -1,4 +1,7 @@
 #!/usr/bin/python
+import json
+import time
+
 from cloudshell.shell.core.driver_context import (
     AutoLoadCommandContext,
     AutoLoadDetails,
@@ -9,40 +12,42 @@ from cloudshell.shell.core.driver_utils import GlobalLock
 from cloudshell.shell.core.orchestration_save_restore import OrchestrationSaveRestore
 from cloudshell.shell.core.resource_driver_interface import ResourceDriverInterface
 from cloudshell.shell.core.session.cloudshell_session import CloudShellSessionContext
-from cloudshell.shell.core.session.logging_session import LoggingSessionContext
-from cloudshell.shell.standards.networking.autoload_model import NetworkingResourceModel
 from cloudshell.shell.standards.networking.driver_interface import (
     NetworkingResourceDriverInterface,
 )
-from cloudshell.shell.standards.networking.resource_config import (
-    NetworkingResourceConfig,
+
+from circuit_breaker import circuit_checked, get_circuit_breaker
+from cli_transport_cache import CiscoIOSCli, get_transport_cache
+from command_profiler import profiled
+from command_scheduler import CommandScheduler, scheduled
+from config_index import SavedConfigsIndex
+from configuration_flow import SAVED_CONFIGS
+from configuration_flow import CiscoIOSConfigurationFlow as ConfigurationFlow
+from connectivity_flow import CiscoIOSConnectivityFlow as ConnectivityFlow
+from connectivity_flow import get_interface_index
+from firmware_flow import CiscoIOSFirmwareFlow as FirmwareFlow
+from fleet_operations import (
+    FleetOperationsFlow,
+    get_backup_server,
+    get_url_server,
+    parse_resource_names,
 )
+from inventory_model import CompactNetworkingResourceModel as NetworkingResourceModel
+from resource_config import CiscoIOSResourceConfig
+from run_command_flow import CiscoIOSRunCommandFlow as CommandFlow
+from session_leases import device_lock, device_locked
+from snmp_cache import CiscoIOSSnmpHandler as SNMPHandler
+from transcript_logging import TranscriptLoggingSessionContext as LoggingSessionContext
 
-from cloudshell.networking.cisco.cli.cisco_cli_handler import CiscoCli
 from cloudshell.networking.cisco.flows.cisco_autoload_flow import (
     CiscoSnmpAutoloadFlow as AutoloadFlow,
 )
-from cloudshell.networking.cisco.flows.cisco_configuration_flow import (
-    CiscoConfigurationFlow as ConfigurationFlow,
-)
-from cloudshell.networking.cisco.flows.cisco_connectivity_flow import (
-    CiscoConnectivityFlow as ConnectivityFlow,
-)
-from cloudshell.networking.cisco.flows.cisco_load_firmware_flow import (
-    CiscoLoadFirmwareFlow as FirmwareFlow,
-)
-from cloudshell.networking.cisco.flows.cisco_run_command_flow import (
-    CiscoRunCommandFlow as CommandFlow,
-)
 from cloudshell.networking.cisco.flows.cisco_state_flow import (
     CiscoStateFlow as StateFlow,
 )
 from cloudshell.networking.cisco.snmp.cisco_snmp_handler import (
     CiscoEnableDisableSnmpFlow,
 )
-from cloudshell.networking.cisco.snmp.cisco_snmp_handler import (
-    CiscoSnmpHandler as SNMPHandler,
-)
 
 
 class CiscoIOSShellDriver(
@@ -55,6 +60,7 @@ class CiscoIOSShellDriver(
     def __init__(self):
         super().__init__()
         self._cli = None
+        self._scheduler = None
 
     def initialize(self, context: InitCommandContext) -> str:
         """Initialize method.
@@ -62,24 +68,28 @@ class CiscoIOSShellDriver(
         :param context: an object with all Resource Attributes inside
         """
         api = CloudShellSessionContext(context).get_api()
-        resource_config = NetworkingResourceConfig.from_context(
-            context=context, api=api
-        )
+        resource_config = CiscoIOSResourceConfig.from_context(context=context, api=api)
 
-        self._cli = CiscoCli(resource_config)
+        self._cli = CiscoIOSCli(resource_config)
+        self._scheduler = CommandScheduler(
+            resource_config.sessions_concurrency_limit, self.SESSION_POOL_TIMEOUT
+        )
         return "Finished initializing"
 
+    @circuit_checked
     @GlobalLock.lock
+    @scheduled
+    @profiled
     def get_inventory(self, context: AutoLoadCommandContext) -> AutoLoadDetails:
         """Return device structure with all standard attributes.
 
         :param context: an object with all Resource Attributes inside
         :return: response
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "get_inventory") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -99,6 +109,9 @@ class CiscoIOSShellDriver(
             logger.info("Autoload completed")
             return response
 
+    @circuit_checked
+    @scheduled
+    @profiled
     def run_custom_command(
         self, context: ResourceCommandContext, custom_command: str
     ) -> str:
@@ -108,10 +121,10 @@ class CiscoIOSShellDriver(
         :param context: an object with all Resource Attributes inside
         :return: result
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "run_custom_command") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -127,6 +140,9 @@ class CiscoIOSShellDriver(
 
             return response
 
+    @circuit_checked
+    @scheduled
+    @profiled
     def run_custom_config_command(
         self, context: ResourceCommandContext, custom_command: str
     ) -> str:
@@ -136,17 +152,19 @@ class CiscoIOSShellDriver(
         :param context: an object with all Resource Attributes inside
         :return: result
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "run_custom_config_command") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
 
             cli_handler = self._cli.get_cli_handler(resource_config, logger)
             send_command_operations = CommandFlow(
-                logger=logger, cli_configurator=cli_handler
+                logger=logger,
+                cli_configurator=cli_handler,
+                window_size=resource_config.config_push_window,
             )
 
             result_str = send_command_operations.run_custom_config_command(
@@ -155,6 +173,9 @@ class CiscoIOSShellDriver(
 
             return result_str
 
+    @circuit_checked
+    @scheduled
+    @profiled
     def ApplyConnectivityChanges(
         self, context: ResourceCommandContext, request: str
     ) -> str:
@@ -165,10 +186,10 @@ class CiscoIOSShellDriver(
         :param str request: request json
         :return:
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "ApplyConnectivityChanges") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -177,6 +198,7 @@ class CiscoIOSShellDriver(
             connectivity_operations = ConnectivityFlow(
                 logger=logger,
                 cli_handler=cli_handler,
+                interface_index=get_interface_index(resource_config.address),
                 support_vlan_range_str=False,
                 support_multi_vlan_str=False,
             )
@@ -185,6 +207,9 @@ class CiscoIOSShellDriver(
             logger.info("Apply Connectivity changes completed")
             return result
 
+    @circuit_checked
+    @scheduled
+    @profiled
     def save(
         self,
         context: ResourceCommandContext,
@@ -200,10 +225,10 @@ class CiscoIOSShellDriver(
         :param vrf_management_name: VRF management Name
         :return str saved configuration file name
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "save") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -224,10 +249,15 @@ class CiscoIOSShellDriver(
                 configuration_type=configuration_type,
                 vrf_management_name=vrf_management_name,
             )
+            if configuration_flow.save_skipped:
+                logger.info("Save skipped, running config wasn't changed")
             logger.info("Save completed")
             return response
 
+    @circuit_checked
     @GlobalLock.lock
+    @scheduled
+    @profiled
     def restore(
         self,
         context: ResourceCommandContext,
@@ -244,10 +274,10 @@ class CiscoIOSShellDriver(
         :param restore_method: append or override methods
         :param vrf_management_name: VRF management Name
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "restore") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -274,6 +304,9 @@ class CiscoIOSShellDriver(
             )
             logger.info("Restore completed")
 
+    @circuit_checked
+    @scheduled
+    @profiled
     def orchestration_save(
         self, context: ResourceCommandContext, mode: str, custom_params: str
     ) -> str:
@@ -287,29 +320,219 @@ class CiscoIOSShellDriver(
         if not mode:
             mode = "shallow"
 
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "orchestration_save") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
 
-            cli_handler = self._cli.get_cli_handler(resource_config, logger)
-            configuration_flow = ConfigurationFlow(
-                cli_handler=cli_handler, logger=logger, resource_config=resource_config
-            )
-
             logger.info("Orchestration save started")
-            response = configuration_flow.orchestration_save(
-                mode=mode, custom_params=custom_params
+            response_json = self._orchestration_save(
+                resource_config, self._cli, logger, mode, custom_params
             )
-            response_json = OrchestrationSaveRestore(
-                logger, resource_config.name
-            ).prepare_orchestration_save_result(response)
             logger.info("Orchestration save completed")
             return response_json
 
+    @profiled
+    def orchestration_save_fleet(
+        self,
+        context: ResourceCommandContext,
+        resource_names: str,
+        mode: str,
+        custom_params: str,
+        max_concurrency: str,
+        max_connections_per_server: str,
+    ) -> str:
+        """Save configurations of many resources concurrently.
+
+        :param context: an object with all Resource Attributes inside
+        :param resource_names: resource names separated by ','
+        :param mode: mode
+        :param custom_params: json with custom save parameters
+        :param max_concurrency: number of resources saved simultaneously
+        :param max_connections_per_server: number of simultaneous transfers
+            to the one TFTP/FTP server
+        :return str response: json with orchestration save result of each resource
+        """
+        if not mode:
+            mode = "shallow"
+
+        with LoggingSessionContext(context, "orchestration_save_fleet") as logger:
+            api = CloudShellSessionContext(context).get_api()
+
+            fleet_operations = FleetOperationsFlow(
+                logger=logger,
+                api=api,
+                context=context,
+                max_workers=int(max_concurrency or FleetOperationsFlow.MAX_WORKERS),
+                max_connections_per_server=int(
+                    max_connections_per_server
+                    or FleetOperationsFlow.MAX_CONNECTIONS_PER_SERVER
+                ),
+            )
+
+            logger.info("Fleet orchestration save started")
+            started = time.time()
+            results, errors, durations = fleet_operations.run(
+                parse_resource_names(resource_names),
+                get_config=lambda ctx: CiscoIOSResourceConfig.from_context(
+                    context=ctx, api=api
+                ),
+                operation=lambda conf, transfer_slot: self._fleet_operation(
+                    conf,
+                    logger,
+                    self._orchestration_save,
+                    mode,
+                    custom_params,
+                    transfer_slot=transfer_slot,
+                ),
+                get_server=lambda conf: get_backup_server(conf, custom_params),
+            )
+            logger.info(
+                f"Fleet orchestration save completed, saved {len(results)}, "
+                f"failed {len(errors)}"
+            )
+            return json.dumps(
+                {
+                    "saved_artifacts": results,
+                    "failed": errors,
+                    "durations": durations,
+                    "duration": time.time() - started,
+                }
+            )
+
+    @profiled
+    def load_firmware_fleet(
+        self,
+        context: ResourceCommandContext,
+        resource_names: str,
+        path: str,
+        vrf_management_name: str,
+        wave_size: str,
+        max_concurrency: str,
+        max_failures: str,
+        max_connections_per_server: str,
+    ) -> str:
+        """Upgrade firmware of many resources in waves.
+
+        :param context: an object with all Resource Attributes inside
+        :param resource_names: resource names separated by ','
+        :param path: full path to firmware file, i.e. tftp://10.10.10.1/firmware.tar
+        :param vrf_management_name: VRF management Name
+        :param wave_size: number of resources in the wave, the next wave starts
+            when all the resources of the previous one are back online
+        :param max_concurrency: number of resources upgraded simultaneously
+        :param max_failures: the next waves are skipped when there are more
+            failed resources
+        :param max_connections_per_server: number of simultaneous image copies
+            from the one TFTP/FTP server
+        :return str response: json with phase durations of each resource
+        """
+        with LoggingSessionContext(context, "load_firmware_fleet") as logger:
+            api = CloudShellSessionContext(context).get_api()
+
+            fleet_operations = FleetOperationsFlow(
+                logger=logger,
+                api=api,
+                context=context,
+                max_workers=int(max_concurrency or FleetOperationsFlow.MAX_WORKERS),
+                max_connections_per_server=int(
+                    max_connections_per_server
+                    or FleetOperationsFlow.MAX_CONNECTIONS_PER_SERVER
+                ),
+            )
+
+            logger.info("Fleet load firmware started")
+            started = time.time()
+            results, errors, durations, skipped = fleet_operations.run_in_waves(
+                parse_resource_names(resource_names),
+                wave_size=int(wave_size or 0),
+                get_config=lambda ctx: CiscoIOSResourceConfig.from_context(
+                    context=ctx, api=api
+                ),
+                operation=lambda conf, transfer_slot: self._fleet_operation(
+                    conf,
+                    logger,
+                    self._load_firmware,
+                    path,
+                    vrf_management_name,
+                    transfer_slot=transfer_slot,
+                ),
+                get_server=lambda conf: get_url_server(path),
+                max_failures=int(max_failures or 0),
+            )
+            logger.info(
+                f"Fleet load firmware completed, upgraded {len(results)}, "
+                f"failed {len(errors)}, skipped {len(skipped)}"
+            )
+            return json.dumps(
+                {
+                    "phase_durations": results,
+                    "failed": errors,
+                    "skipped": skipped,
+                    "durations": durations,
+                    "duration": time.time() - started,
+                }
+            )
+
+    @staticmethod
+    def _fleet_operation(resource_config, logger, operation, *args, **kwargs):
+        """Run the operation on the resource of the fleet with its own CLI.
+
+        The CLI sessions are disconnected when the operation is done.
+        """
+        cli = CiscoIOSCli(resource_config)
+        try:
+            return operation(resource_config, cli, logger, *args, **kwargs)
+        finally:
+            cli.close(logger)
+
+    def _load_firmware(
+        self,
+        resource_config,
+        cli,
+        logger,
+        path,
+        vrf_management_name,
+        transfer_slot=None,
+    ):
+        cli_handler = cli.get_cli_handler(resource_config, logger)
+        firmware_operations = FirmwareFlow(
+            cli_handler=cli_handler,
+            logger=logger,
+            resource_config=resource_config,
+            transfer_slot=transfer_slot,
+        )
+        # the resource's own load_firmware may run in another driver process
+        with device_lock(resource_config.address):
+            return firmware_operations.load_firmware(
+                path=path,
+                vrf_management_name=vrf_management_name
+                or resource_config.vrf_management_name,
+            )
+
+    def _orchestration_save(
+        self, resource_config, cli, logger, mode, custom_params, transfer_slot=None
+    ):
+        cli_handler = cli.get_cli_handler(resource_config, logger)
+        configuration_flow = ConfigurationFlow(
+            cli_handler=cli_handler,
+            logger=logger,
+            resource_config=resource_config,
+            transfer_slot=transfer_slot,
+        )
+        response = configuration_flow.orchestration_save(
+            mode=mode, custom_params=custom_params
+        )
+        return OrchestrationSaveRestore(
+            logger, resource_config.name
+        ).prepare_orchestration_save_result(response)
+
+    @circuit_checked
+    @scheduled
+    @profiled
     def orchestration_restore(
         self,
         context: ResourceCommandContext,
@@ -322,10 +545,10 @@ class CiscoIOSShellDriver(
         :param saved_artifact_info: OrchestrationSavedArtifactInfo json
         :param custom_params: json with custom restore parameters
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "orchestration_restore") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -342,7 +565,11 @@ class CiscoIOSShellDriver(
             configuration_flow.restore(**restore_params)
             logger.info("Orchestration restore completed")
 
+    @circuit_checked
     @GlobalLock.lock
+    @device_locked
+    @scheduled
+    @profiled
     def load_firmware(
         self, context: ResourceCommandContext, path: str, vrf_management_name: str
     ):
@@ -352,10 +579,10 @@ class CiscoIOSShellDriver(
         :param path: full path to firmware file, i.e. tftp://10.10.10.1/firmware.tar
         :param vrf_management_name: VRF management Name
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "load_firmware") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -369,21 +596,24 @@ class CiscoIOSShellDriver(
             firmware_operations = FirmwareFlow(
                 cli_handler=cli_handler, logger=logger, resource_config=resource_config
             )
-            firmware_operations.load_firmware(
+            durations = firmware_operations.load_firmware(
                 path=path, vrf_management_name=vrf_management_name
             )
-            logger.info("Finish Load Firmware.")
+            logger.info(f"Finish Load Firmware, phase durations: {durations}")
 
+    @circuit_checked
+    @scheduled
+    @profiled
     def health_check(self, context: ResourceCommandContext):
         """Performs device health check.
 
         :param context: an object with all Resource Attributes inside
         :return: Success or Error message
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "health_check") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -397,19 +627,83 @@ class CiscoIOSShellDriver(
             )
             return state_operations.health_check()
 
+    def get_command_scheduler_statistics(self, context: ResourceCommandContext) -> str:
+        """Return queue depth and wait time statistics of the command scheduler.
+
+        :param context: an object with all Resource Attributes inside
+        :return: statistics json
+        """
+        return json.dumps(self._scheduler.get_statistics())
+
+    def get_last_save_status(self, context: ResourceCommandContext) -> str:
+        """Return the file name of the last save and whether it was skipped.
+
+        :param context: an object with all Resource Attributes inside
+        :return: status json
+        """
+        return json.dumps(SAVED_CONFIGS.get_last_save(context.resource.address) or {})
+
+    def get_cli_transport_statistics(self, context: ResourceCommandContext) -> str:
+        """Return the cached CLI transport of the device and connect time saved.
+
+        :param context: an object with all Resource Attributes inside
+        :return: statistics json
+        """
+        return json.dumps(
+            get_transport_cache().get_statistics(context.resource.address)
+        )
+
+    def get_circuit_breaker_state(self, context: ResourceCommandContext) -> str:
+        """Return the state and failure counts of the device's circuit breaker.
+
+        :param context: an object with all Resource Attributes inside
+        :return: statistics json
+        """
+        circuit_breaker = get_circuit_breaker(context.resource.address)
+        return json.dumps(circuit_breaker.get_statistics() if circuit_breaker else {})
+
+    def query_saved_configs(
+        self,
+        context: ResourceCommandContext,
+        line: str,
+        section: str,
+        configuration_type: str,
+    ) -> str:
+        """Find the resources whose indexed saved configs have the matching lines.
+
+        :param context: an object with all Resource Attributes inside
+        :param line: config line, exact or with "*", "?" and "[]" wildcards
+        :param section: top level config section, exact or with wildcards
+        :param configuration_type: running or startup saved configs
+        :return: matched resources json
+        """
+        started = time.time()
+        resources = SavedConfigsIndex().query(
+            line=line, section=section, configuration_type=configuration_type or None
+        )
+        return json.dumps(
+            {
+                "resources": resources,
+                "query_time": round(time.time() - started, 3),
+            }
+        )
+
     def cleanup(self):
         pass
 
+    @circuit_checked
+    @scheduled
+    @profiled
     def shutdown(self, context: ResourceCommandContext):
         """Shutdown device.
 
         :param context: an object with all Resource Attributes inside
         :return:
         """
-        with LoggingSessionContext(context) as logger:
+        with LoggingSessionContext(context, "shutdown") as logger:
             api = CloudShellSessionContext(context).get_api()
 
-            resource_config = NetworkingResourceConfig.from_context(
+            resource_config = CiscoIOSResourceConfig.from_context(
                 context=context,
                 api=api,
             )
@@ -0,0 +1,250 @@
+#!/usr/bin/python
+import re
+import socket
+import time
+from contextlib import contextmanager, nullcontext
+
+from cloudshell.cli.command_template.command_template_executor import (
+    CommandTemplateExecutor,
+)
+from cloudshell.shell.flows.utils.url import BasicLocalUrl
+
+from cloudshell.networking.cisco.command_actions.system_actions import SystemActions
+from cloudshell.networking.cisco.command_templates import configuration
+from cloudshell.networking.cisco.flows.cisco_load_firmware_flow import (
+    CiscoLoadFirmwareFlow,
+)
+
+COPY_PHASE = "copy"
+VERIFY_PHASE = "verify"
+RELOAD_PHASE = "reload"
+BACK_ONLINE_PHASE = "back_online"
+
+
+class ReloadTimeoutException(Exception):
+    """Device didn't come back online after the reload."""
+
+
+def is_port_open(host, port, timeout):
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def wait_for_port(
+    host,
+    port,
+    online=True,
+    timeout=3600,
+    initial_delay=5,
+    max_delay=30,
+    connect_timeout=3,
+):
+    """Wait for the TCP port to open or close, probing with exponential backoff.
+
+    :param str host: device address
+    :param int port: CLI port of the device
+    :param bool online: wait for the port to open, or to close if False
+    :param int timeout: seconds to wait
+    :param int initial_delay: delay between the first probes
+    :param int max_delay: max delay between the probes
+    :param int connect_timeout: timeout of the probe connection
+    :return: seconds waited
+    :rtype: float
+    """
+    started = time.monotonic()
+    delay = initial_delay
+    while is_port_open(host, port, connect_timeout) != online:
+        elapsed = time.monotonic() - started
+        if elapsed >= timeout:
+            raise ReloadTimeoutException(
+                "wait_for_port",
+                f"Port {host}:{port} is still {'closed' if online else 'open'} "
+                f"after {elapsed:.0f} sec",
+            )
+        time.sleep(min(delay, max(timeout - elapsed, 0)))
+        delay = min(delay * 2, max_delay)
+    return time.monotonic() - started
+
+
+class PhaseTimer:
+    """Durations of the phases, repeated phase adds up."""
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + round(
+                time.monotonic() - started, 3
+            )
+
+
+class CiscoIOSFirmwareFlow(CiscoLoadFirmwareFlow):
+    """Load firmware flow timing its phases.
+
+    The device is reloaded without the fixed sleep, the flow waits for the
+    CLI port to close and then probes it with exponential backoff, so the
+    session is reconnected once the device is back online.
+    """
+
+    OFFLINE_TIMEOUT = 300
+
+    def __init__(
+        self, cli_handler, logger, resource_config, transfer_slot=None, **kwargs
+    ):
+        """Firmware flow.
+
+        :param transfer_slot: context manager held while the image is copied
+            from the server, limits simultaneous transfers
+        """
+        super().__init__(cli_handler, logger, resource_config, **kwargs)
+        self.phase_timer = PhaseTimer()
+        self._transfer_slot = transfer_slot or nullcontext()
+
+    def load_firmware(self, path, vrf_management_name=None):
+        """Load firmware onto the device.
+
+        :return: durations of copy, verify, reload and back_online phases
+        :rtype: dict
+        """
+        super().load_firmware(path, vrf_management_name)
+        return self.phase_timer.durations
+
+    def _load_firmware_flow(self, path, vrf_management_name, timeout):
+        firmware_file_name = path.filename
+        if not firmware_file_name:
+            raise Exception(self.__class__.__name__, "Unable to find firmware file")
+
+        with self._cli_handler.get_cli_service(
+            self._cli_handler.enable_mode
+        ) as enable_session:
+            system_action = SystemActions(enable_session, self._logger)
+
+            with self.phase_timer.phase(COPY_PHASE):
+                firmware_dst_path = self._copy_firmware(
+                    system_action, path, vrf_management_name
+                )
+
+            with self.phase_timer.phase(VERIFY_PHASE):
+                self._set_boot_firmware(
+                    enable_session,
+                    system_action,
+                    firmware_dst_path,
+                    vrf_management_name,
+                )
+
+            if "CONSOLE" in enable_session.session.SESSION_TYPE:
+                with self.phase_timer.phase(RELOAD_PHASE):
+                    system_action.reload_device_via_console(timeout)
+            else:
+                self._reload(enable_session, timeout)
+
+            with self.phase_timer.phase(VERIFY_PHASE):
+                os_version = system_action.get_current_os_version()
+            if os_version.find(firmware_file_name) == -1:
+                raise Exception(
+                    self.__class__.__name__,
+                    "Failed to load firmware, Please check logs",
+                )
+        self._logger.info(
+            f"Firmware loaded, phase durations: {self.phase_timer.durations}"
+        )
+
+    def _copy_firmware(self, system_action, path, vrf_management_name):
+        """Copy the image to the boot file system or to each stack member flash.
+
+        :return: path of the image to boot from
+        """
+        firmware_dst_path = f"{self._file_system}/{path.filename}"
+        device_file_system = system_action.get_flash_folders_list()
+        self._logger.info(f"Discovered folders: {device_file_system}")
+        destinations = []
+        for flash in sorted(device_file_system or []):
+            if flash in self.BOOTFOLDER:
+                firmware_dst_path = f"{flash}/{path.filename}"
+                destinations.append(firmware_dst_path)
+                break
+            if "flash-" in flash:
+                destinations.append(f"{flash}/{path.filename}")
+        if not device_file_system:
+            destinations.append(firmware_dst_path)
+
+        with self._transfer_slot:
+            for destination in destinations:
+                self._logger.info(f"Copying {destination} image")
+                system_action.copy(
+                    path.url,
+                    destination,
+                    vrf=vrf_management_name,
+                    action_map=system_action.prepare_action_map(
+                        path, BasicLocalUrl.from_str(destination)
+                    ),
+                )
+        return firmware_dst_path
+
+    def _set_boot_firmware(
+        self, enable_session, system_action, firmware_dst_path, vrf_management_name
+    ):
+        self._logger.info("Get current boot configuration")
+        current_boot = system_action.get_current_boot_image()
+        self._logger.info("Modifying boot configuration")
+        self._apply_firmware(enable_session, current_boot, firmware_dst_path)
+
+        output = system_action.get_current_boot_config()
+        new_boot_settings = re.sub("^.*boot-start-marker|boot-end-marker.*", "", output)
+        self._logger.info(f"Boot config lines updated: {new_boot_settings}")
+
+        firmware_file_name = firmware_dst_path.split("/")[-1]
+        if output.find(firmware_file_name) == -1:
+            raise Exception(
+                self.__class__.__name__,
+                f"Can't add firmware '{firmware_file_name}' for boot!",
+            )
+        running_config = BasicLocalUrl.from_str(self.RUNNING_CONFIG, "/")
+        startup_config = BasicLocalUrl.from_str(self.STARTUP_CONFIG, "/")
+        system_action.copy(
+            self.RUNNING_CONFIG,
+            self.STARTUP_CONFIG,
+            vrf=vrf_management_name,
+            action_map=system_action.prepare_action_map(running_config, startup_config),
+        )
+
+    def _reload(self, enable_session, timeout):
+        """Reload the device and reconnect when its CLI port is open again."""
+        session = enable_session.session
+        host, port = session.host, int(session.port)
+
+        with self.phase_timer.phase(RELOAD_PHASE):
+            self._send_reload(enable_session)
+            try:
+                wait_for_port(host, port, online=False, timeout=self.OFFLINE_TIMEOUT)
+            except ReloadTimeoutException:
+                self._logger.warning(
+                    f"Port {host}:{port} didn't close after the reload, "
+                    f"waiting for the device anyway"
+                )
+
+        with self.phase_timer.phase(BACK_ONLINE_PHASE):
+            started = time.monotonic()
+            wait_for_port(host, port, online=True, timeout=timeout)
+            self._logger.info(f"Device {host} is back online, reconnecting")
+            enable_session.reconnect(max(timeout - (time.monotonic() - started), 60))
+
+    def _send_reload(self, cli_service):
+        try:
+            output = CommandTemplateExecutor(
+                cli_service, configuration.REDUNDANCY_PEER_SHELF
+            ).execute_command()
+            if re.search(r"[Ii]nvalid\s*([Ii]nput|[Cc]ommand)", output, re.IGNORECASE):
+                CommandTemplateExecutor(
+                    cli_service, configuration.RELOAD
+                ).execute_command()
+        except Exception:
+            self._logger.info("Device rebooted, waiting for it to come back online")
@@ -0,0 +1,213 @@
+#!/usr/bin/python
+import threading
+import time
+from concurrent import futures as ft
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import jsonpickle
+from cloudshell.shell.core.driver_context import (
+    ResourceCommandContext,
+    ResourceContextDetails,
+)
+
+from circuit_breaker import get_circuit_breaker
+
+
+def parse_resource_names(resource_names):
+    """Parse resource names separated by ',' or ';'.
+
+    :param str resource_names: "router1, router2;router3"
+    :rtype: list[str]
+    """
+    names = resource_names.replace(";", ",").split(",")
+    return list(dict.fromkeys(name.strip() for name in names if name.strip()))
+
+
+def get_resource_context(api, context, resource_name):
+    """Build command context for the resource from its details in CloudShell.
+
+    :param cloudshell.api.cloudshell_api.CloudShellAPISession api:
+    :param ResourceCommandContext context: context of the command
+    :param str resource_name: resource name
+    :rtype: ResourceCommandContext
+    """
+    details = api.GetResourceDetails(resource_name)
+    resource = ResourceContextDetails(
+        id=details.UniqeIdentifier,
+        name=details.Name,
+        fullname=details.Name,
+        type="Resource",
+        address=details.Address,
+        model=details.ResourceModelName,
+        family=details.ResourceFamilyName,
+        description=details.Description,
+        attributes={attr.Name: attr.Value for attr in details.ResourceAttributes},
+        app_context=None,
+        networks_info=None,
+        shell_standard=getattr(context.resource, "shell_standard", None),
+        shell_standard_version=getattr(
+            context.resource, "shell_standard_version", None
+        ),
+    )
+    return ResourceCommandContext(
+        connectivity=context.connectivity,
+        resource=resource,
+        reservation=context.reservation,
+        connectors=[],
+    )
+
+
+def get_url_server(url):
+    """Return lower case host name of the url or empty string for local paths."""
+    return (urlsplit(url or "").hostname or "").lower()
+
+
+def get_backup_server(resource_config, custom_params=None):
+    """Return the server the device will transfer the configuration to.
+
+    :param resource_config: resource config of the device
+    :param str custom_params: orchestration save custom params json
+    :return: host name, or empty string for the device file system
+    :rtype: str
+    """
+    folder_path = ""
+    if custom_params:
+        params = jsonpickle.decode(custom_params).get("custom_params", {})
+        folder_path = params.get("folder_path", "")
+    return get_url_server(folder_path or resource_config.backup_location)
+
+
+class ServerConnectionLimiter:
+    """Limit simultaneous transfers per TFTP/FTP server."""
+
+    def __init__(self, max_connections_per_server):
+        self._max_connections = max_connections_per_server
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def get_semaphore(self, server):
+        with self._lock:
+            if server not in self._semaphores:
+                self._semaphores[server] = threading.BoundedSemaphore(
+                    self._max_connections
+                )
+            return self._semaphores[server]
+
+
+class FleetOperationsFlow:
+    """Run an operation on many resources concurrently."""
+
+    MAX_WORKERS = 10
+    MAX_CONNECTIONS_PER_SERVER = 5
+
+    def __init__(
+        self,
+        logger,
+        api,
+        context,
+        max_workers=MAX_WORKERS,
+        max_connections_per_server=MAX_CONNECTIONS_PER_SERVER,
+    ):
+        """Fleet operations flow.
+
+        :param logging.Logger logger:
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession api:
+        :param ResourceCommandContext context: context of the command
+        :param int max_workers: number of resources processed simultaneously
+        :param int max_connections_per_server: number of simultaneous transfers
+            to the one backup server
+        """
+        self._logger = logger
+        self._api = api
+        self._context = context
+        self._max_workers = max_workers
+        self._limiter = ServerConnectionLimiter(max_connections_per_server)
+
+    def run(self, resource_names, get_config, operation, get_server=None):
+        """Run the operation for each resource.
+
+        :param list[str] resource_names:
+        :param get_config: callable(context) -> resource config
+        :param operation: callable(resource_config, transfer_slot) -> result,
+            the operation holds the transfer_slot context manager while it
+            transfers files to the server
+        :param get_server: callable(resource_config) -> server name, transfers
+            to the same server are limited
+        :return: results, errors and durations by resource name
+        :rtype: tuple[dict, dict, dict]
+        """
+        results, errors, durations = {}, {}, {}
+        with ft.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._run_for_resource, name, get_config, operation, get_server
+                ): name
+                for name in resource_names
+            }
+            for future in ft.as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name], durations[name] = future.result()
+                except Exception as e:
+                    self._logger.exception(f"Operation failed for resource {name}")
+                    errors[name] = str(e)
+        return results, errors, durations
+
+    def run_in_waves(
+        self,
+        resource_names,
+        wave_size,
+        get_config,
+        operation,
+        get_server=None,
+        max_failures=0,
+    ):
+        """Run the operation wave by wave, a wave starts when the previous one ends.
+
+        :param list[str] resource_names:
+        :param int wave_size: number of resources in the wave, all if 0
+        :param get_config: callable(context) -> resource config
+        :param operation: callable(resource_config, transfer_slot) -> result
+        :param get_server: callable(resource_config) -> server name
+        :param int max_failures: the next waves are skipped when there are more
+            failed resources
+        :return: results, errors, durations by resource name and the names of
+            the skipped resources
+        :rtype: tuple[dict, dict, dict, list[str]]
+        """
+        wave_size = wave_size or len(resource_names) or 1
+        waves = [
+            resource_names[i : i + wave_size]
+            for i in range(0, len(resource_names), wave_size)
+        ]
+        results, errors, durations = {}, {}, {}
+        for number, wave in enumerate(waves, 1):
+            if len(errors) > max_failures:
+                skipped = [name for names in waves[number - 1 :] for name in names]
+                self._logger.warning(
+                    f"{len(errors)} resources failed, skipping {len(skipped)} "
+                    f"resources of the next waves"
+                )
+                return results, errors, durations, skipped
+            self._logger.info(f"Wave {number}/{len(waves)} started: {wave}")
+            wave_results, wave_errors, wave_durations = self.run(
+                wave, get_config, operation, get_server
+            )
+            results.update(wave_results)
+            errors.update(wave_errors)
+            durations.update(wave_durations)
+        return results, errors, durations, []
+
+    def _run_for_resource(self, resource_name, get_config, operation, get_server):
+        context = get_resource_context(self._api, self._context, resource_name)
+        resource_config = get_config(context)
+        circuit_breaker = get_circuit_breaker(resource_config.address)
+        if circuit_breaker is not None:
+            circuit_breaker.check()
+        server = get_server(resource_config) if get_server else ""
+        transfer_slot = self._limiter.get_semaphore(server) if server else nullcontext()
+
+        started = time.time()
+        result = operation(resource_config, transfer_slot)
+        return result, time.time() - started
@@ -0,0 +1,170 @@
+#!/usr/bin/python
+from cloudshell.shell.core.driver_context import AutoLoadAttribute, AutoLoadDetails
+from cloudshell.shell.standards.core.autoload.core_entities import (
+    AttributeModel,
+    AttributeName,
+)
+from cloudshell.shell.standards.core.autoload.utils import (
+    AutoloadDetailsBuilder,
+    is_module_without_children,
+)
+from cloudshell.shell.standards.core.utils import attr_length_validator
+from cloudshell.shell.standards.networking.autoload_model import (
+    GenericChassis,
+    GenericModule,
+    GenericPort,
+    GenericPortChannel,
+    GenericPowerPort,
+    GenericSubModule,
+    NetworkingResourceModel,
+)
+
+
+class CompactInstanceAttribute:
+    """Validated instance attribute kept in the instance itself.
+
+    The standard InstanceAttribute keeps values of all the instances in a dict
+    of the class descriptor, so resources of every autoload stay in memory.
+    """
+
+    def __set_name__(self, owner, name):
+        self._key = f"_compact{name}"
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.__dict__.get(self._key)
+
+    @attr_length_validator(AttributeModel.MAX_LENGTH)
+    def __set__(self, instance, value):
+        instance.__dict__[self._key] = value
+
+
+class CompactAttributes(dict):
+    """Resource attributes keyed by the shared attribute descriptors.
+
+    The standard container keys every value with a new AttributeName object
+    bound to the resource, here the class level descriptor is the key.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def _get_model(key):
+        if isinstance(key, AttributeName):
+            return key._attribute_model
+        return key
+
+    def __setitem__(self, key, value):
+        super().__setitem__(self._get_model(key), value)
+
+    def __getitem__(self, key):
+        return super().__getitem__(self._get_model(key))
+
+    def __contains__(self, key):
+        return super().__contains__(self._get_model(key))
+
+    def get(self, key, default=None):
+        return super().get(self._get_model(key), default)
+
+    def named_items(self, resource):
+        """Iterate over attribute names for the resource and values."""
+        for model, value in self.items():
+            yield model.attribute_name(resource), value
+
+
+class _CompactResource:
+    _name = CompactInstanceAttribute()
+    _unique_identifier = CompactInstanceAttribute()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.attributes = CompactAttributes(self.attributes)
+
+
+class CompactChassis(_CompactResource, GenericChassis):
+    pass
+
+
+class CompactModule(_CompactResource, GenericModule):
+    pass
+
+
+class CompactSubModule(_CompactResource, GenericSubModule):
+    pass
+
+
+class CompactPort(_CompactResource, GenericPort):
+    pass
+
+
+class CompactPortChannel(_CompactResource, GenericPortChannel):
+    pass
+
+
+class CompactPowerPort(_CompactResource, GenericPowerPort):
+    pass
+
+
+class StreamingAutoloadDetailsBuilder(AutoloadDetailsBuilder):
+    """Build AutoLoadDetails in one pass over the resource tree.
+
+    Resources and attributes are appended to the same lists in the order of
+    the standard builder, without the intermediate details of every branch.
+    Attributes of a resource are released once they are converted.
+    """
+
+    def build_details(self):
+        resources = []
+        attributes = []
+        stack = [self._resource_model]
+        while stack:
+            resource = stack.pop()
+            resource.shell_name = resource.shell_name or self._resource_model.shell_name
+            resources.extend(self._get_autoload_resources(resource))
+            attributes.extend(self._get_autoload_attributes(resource))
+            resource.attributes.clear()
+            children = [
+                child
+                for child in resource.extract_sub_resources()
+                if not is_module_without_children(child)
+            ]
+            stack.extend(reversed(children))
+        return AutoLoadDetails(resources, attributes)
+
+    def _get_autoload_attributes(self, resource):
+        relative_address = self._get_relative_address(resource)
+        if isinstance(resource.attributes, CompactAttributes):
+            items = resource.attributes.named_items(resource)
+        else:
+            items = ((str(name), value) for name, value in resource.attributes.items())
+        return [
+            AutoLoadAttribute(
+                relative_address=relative_address,
+                attribute_name=name,
+                attribute_value=str(value),
+            )
+            for name, value in items
+            if value is not None
+        ]
+
+
+class CompactNetworkingResourceModel(_CompactResource, NetworkingResourceModel):
+    """Networking resource model with compact resources and streaming build."""
+
+    @property
+    def entities(self):
+        class _CompactEntities:
+            Chassis = CompactChassis
+            Module = CompactModule
+            SubModule = CompactSubModule
+            Port = CompactPort
+            PortChannel = CompactPortChannel
+            PowerPort = CompactPowerPort
+
+        return _CompactEntities
+
+    def build(self):
+        return StreamingAutoloadDetailsBuilder(
+            self, self._existed_resource_info
+        ).build_details()
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+from attrs import define, fields_dict
+from cloudshell.shell.standards.core.resource_conf import attr
+from cloudshell.shell.standards.core.resource_conf.resource_attr import AttrMeta
+from cloudshell.shell.standards.networking.resource_config import (
+    NetworkingResourceConfig,
+)
+
+
+@define(slots=False, str=False)
+class CiscoIOSResourceConfig(NetworkingResourceConfig):
+    skip_unchanged_save: bool = attr("Skip Unchanged Save", default=False)
+    global_sessions_limit: bool = attr("Global Sessions Limit", default=False)
+    config_push_window: int = attr("Config Push Window", default=1)
+    index_saved_configs: bool = attr("Index Saved Configs", default=False)
+    circuit_breaker_threshold: int = attr("Circuit Breaker Threshold", default=3)
+    adaptive_timeouts: str = attr("Adaptive Timeouts", default="cli=30-3600, snmp=2-30")
+    restore_preflight: bool = attr("Restore Preflight", default=False)
+    system_name: str = attr("System Name", default="")
+    os_version: str = attr("OS Version", default="")
+    cli_transcript_logging: str = attr("CLI Transcript Logging", default="on")
+    command_profiling_threshold: float = attr(
+        "Command Profiling Threshold", default=0.0, converter=float
+    )
+
+    @classmethod
+    def attribute_from_context(cls, context, name):
+        """Read one attribute of the resource without building the config.
+
+        Used before the API session is created, e.g. by the logging and the
+        profiling of the driver commands, password attributes can't be read.
+        :param str name: name of the config field
+        :return: attribute value or its default if the context has no resource
+        """
+        field = fields_dict(cls)[name]
+        try:
+            attrs_getter = cls._ATTR_GETTER(cls, None, context)
+            value = attrs_getter._get_val(field, AttrMeta.from_field(field))
+        except (AttributeError, TypeError):
+            return field.default
+        value = cls._CONVERTER(cls, {name: value}).convert()[name]
+        return field.converter(value) if field.converter else value
@@ -0,0 +1,110 @@
+#!/usr/bin/python
+import re
+import time
+
+from cloudshell.networking.cisco.cli.cisco_command_modes import ConfigCommandMode
+from cloudshell.networking.cisco.flows.cisco_run_command_flow import CiscoRunCommandFlow
+
+CONFIG_PROMPT_PATTERN = r"[^\s#]*\(config[^)]*\)#"
+CONFIG_ERROR_PATTERN = re.compile(r"^% .*$", re.MULTILINE)
+# banners span several lines, the other lines ask to confirm or leave config mode
+NOT_PIPELINED_PATTERN = re.compile(
+    r"^\s*(banner\s|end$|exit$|crypto\s+(key|pki)\s|no\s+crypto\s"
+    r"|do\s+(copy|delete|erase|reload|write)\b)",
+    re.IGNORECASE,
+)
+
+
+class CiscoIOSRunCommandFlow(CiscoRunCommandFlow):
+    """Run command flow which pipelines long config command lists.
+
+    Config lines are sent in windows without waiting for the prompt after
+    each line. A comment line with the window marker is sent after the window,
+    its echo followed by the prompt means the whole window was processed.
+    Commands with a banner, a line asking to confirm or leaving the config
+    mode are sent line by line.
+    """
+
+    WINDOW_MARKER = "! pipelined window {}"
+
+    def __init__(self, logger, cli_configurator, window_size=1):
+        """Create run command flow.
+
+        :param int window_size: config lines sent without waiting for the prompt,
+            1 disables pipelining
+        """
+        super().__init__(logger, cli_configurator)
+        self._window_size = int(window_size)
+
+    def _run_command_flow(self, custom_command, is_config=False):
+        commands = self.parse_custom_commands(custom_command)
+        if not is_config or self._window_size < 2 or len(commands) < 2:
+            return super()._run_command_flow(custom_command, is_config)
+        not_pipelined = [c for c in commands if NOT_PIPELINED_PATTERN.match(c.strip())]
+        if not_pipelined:
+            self._logger.info(
+                f"Config lines can't be pipelined, sending them line by line: "
+                f"{not_pipelined[0]}"
+            )
+            return super()._run_command_flow(custom_command, is_config)
+
+        with self._cli_configurator.config_mode_service() as session:
+            return self._push_config(session, commands)
+
+    def _push_config(self, cli_service, commands):
+        """Send config lines in windows and collect the failed ones.
+
+        :param cloudshell.cli.service.cli_service_impl.CliServiceImpl cli_service:
+        :param list[str] commands: config lines
+        :return: device output with push statistics
+        """
+        session = cli_service.session
+        started = time.time()
+        outputs = []
+        failed = []
+        for index in range(0, len(commands), self._window_size):
+            window = commands[index : index + self._window_size]
+            marker = self.WINDOW_MARKER.format(index // self._window_size)
+            for command in window:
+                session.send_line(command, self._logger)
+            session.send_line(marker, self._logger)
+            output = session.hardware_expect(
+                None,
+                rf"{re.escape(marker)}[^\n]*\n[\s\S]*{ConfigCommandMode.PROMPT}",
+                self._logger,
+            )
+            outputs.append(output)
+            failed.extend(self._get_failed_lines(window, output, index))
+
+        duration = time.time() - started
+        lines_per_second = len(commands) / duration if duration else 0.0
+        summary = (
+            f"Pushed {len(commands)} config lines in {duration:.2f} sec "
+            f"({lines_per_second:.1f} lines/sec), failed {len(failed)} lines"
+        )
+        self._logger.info(summary)
+        result = ["".join(outputs), summary]
+        result.extend(
+            f"Line {number}: {command}: {error}" for number, command, error in failed
+        )
+        return "\n".join(result)
+
+    @staticmethod
+    def _get_failed_lines(window, output, offset=0):
+        """Map errors in the window output to the source lines.
+
+        Output of the window is split by the config prompts, the part after
+        N-th prompt starts with the echo of the N-th line of the window.
+
+        :return: list of (line number, line, error)
+        """
+        parts = re.split(CONFIG_PROMPT_PATTERN, output)
+        if not parts[0].strip().startswith(window[0].strip()):
+            # output starts with the prompt of the previous window
+            parts = parts[1:]
+        failed = []
+        for number, (command, part) in enumerate(zip(window, parts), offset + 1):
+            errors = CONFIG_ERROR_PATTERN.findall(part)
+            if errors:
+                failed.append((number, command, "; ".join(e.strip() for e in errors)))
+        return failed
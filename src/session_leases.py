@@ -0,0 +1,179 @@
+#!/usr/bin/python
+import os
+import re
+import time
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+
+from cloudshell.cli.service.session_pool_manager import SessionPoolManager
+
+from state_storage import get_state_dir
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+LEASES_DIR_NAME = "session_leases"
+DEVICE_LOCKS_DIR_NAME = "device_locks"
+
+
+class SessionLeaseException(Exception):
+    """Session lease exception."""
+
+
+def _try_lock(fd):
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class DeviceSessionLeases:
+    """Limit sessions to the device used by all the driver processes at once.
+
+    Each of the max_sessions slots of the device is a lock file, the slot is
+    leased while its file is locked. Locks are released by the OS if the
+    process dies, so slots never leak.
+    """
+
+    POLL_INTERVAL = 0.05
+    MAX_POLL_INTERVAL = 1
+
+    def __init__(self, device, max_sessions, leases_dir=None):
+        self._device = re.sub(r"[^\w.-]", "_", device)
+        self._max_sessions = max(int(max_sessions), 1)
+        self._leases_dir = leases_dir or os.path.join(get_state_dir(), LEASES_DIR_NAME)
+        os.makedirs(self._leases_dir, exist_ok=True)
+
+    def _get_slot_path(self, slot):
+        return os.path.join(self._leases_dir, f"{self._device}.{slot}.lock")
+
+    def acquire(self, timeout, wait=time.sleep):
+        """Lease a free slot of the device.
+
+        :param float timeout: time to wait for a free slot
+        :param wait: callable(seconds) used to wait between the polls
+        :return: file descriptor of the leased slot
+        """
+        deadline = time.time() + timeout
+        poll_interval = self.POLL_INTERVAL
+        while True:
+            for slot in range(self._max_sessions):
+                fd = os.open(self._get_slot_path(slot), os.O_RDWR | os.O_CREAT)
+                if _try_lock(fd):
+                    return fd
+                os.close(fd)
+            if time.time() + poll_interval > deadline:
+                raise SessionLeaseException(
+                    self.__class__.__name__,
+                    f"All {self._max_sessions} sessions to {self._device} are "
+                    f"in use by other processes for {timeout:.0f} sec",
+                )
+            wait(poll_interval)
+            poll_interval = min(poll_interval * 2, self.MAX_POLL_INTERVAL)
+
+    @staticmethod
+    def release(fd):
+        try:
+            _unlock(fd)
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def device_lock(device, locks_dir=None):
+    """Run the exclusive operation on the device, one for all the processes.
+
+    Waits until the operations on the device started by the other driver
+    processes, e.g. a fleet firmware upgrade, are done.
+    """
+    locks = DeviceSessionLeases(
+        device, 1, locks_dir or os.path.join(get_state_dir(), DEVICE_LOCKS_DIR_NAME)
+    )
+    lock = locks.acquire(float("inf"))
+    try:
+        yield
+    finally:
+        locks.release(lock)
+
+
+def device_locked(func):
+    """Run the driver command holding the lock of the device."""
+
+    @wraps(func)
+    def _wrap_func(self, context, *args, **kwargs):
+        resource = getattr(context, "resource", None)
+        device = getattr(resource, "address", None)
+        if device is None:
+            return func(self, context, *args, **kwargs)
+        with device_lock(device):
+            return func(self, context, *args, **kwargs)
+
+    return _wrap_func
+
+
+class LeasingSessionPoolManager(SessionPoolManager):
+    """Session pool that leases a device slot for each session in use.
+
+    The slot is leased when a session is taken from the pool and released
+    when it's returned or removed, so sessions idle in the pool of one
+    process don't starve the others. Idle pooled sessions stay connected,
+    the limit applies to the sessions in use.
+    """
+
+    def __init__(self, leases, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._leases = leases
+        self._leased = {}
+        self._leased_lock = Lock()
+
+    def get_session(self, defined_sessions, prompt, logger):
+        started = time.time()
+        with self._session_condition:
+            # the pool lock is released while waiting, a session returned to
+            # the pool frees its slot and wakes the waiter up
+            lease = self._leases.acquire(
+                self._pool_timeout, wait=self._session_condition.wait
+            )
+            logger.debug(f"Session slot leased in {time.time() - started:.2f} sec")
+            try:
+                session = super().get_session(defined_sessions, prompt, logger)
+            except Exception:
+                self._leases.release(lease)
+                raise
+        with self._leased_lock:
+            self._leased[id(session)] = lease
+        return session
+
+    def _release(self, session):
+        with self._leased_lock:
+            lease = self._leased.pop(id(session), None)
+        if lease is not None:
+            self._leases.release(lease)
+
+    def return_session(self, session, logger):
+        with self._session_condition:
+            self._release(session)
+            super().return_session(session, logger)
+
+    def remove_session(self, session, logger):
+        with self._session_condition:
+            try:
+                super().remove_session(session, logger)
+            finally:
+                self._release(session)
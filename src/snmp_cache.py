@@ -0,0 +1,253 @@
+#!/usr/bin/python
+import hashlib
+from threading import Lock
+
+from cloudshell.snmp.cloudshell_snmp import Snmp
+from cloudshell.snmp.core.snmp_engine import QualiSnmpEngine
+from cloudshell.snmp.core.snmp_msg_pdu_dsp import QualiMsgAndPduDispatcher
+from cloudshell.snmp.core.tools.snmp_constants import (
+    AUTH_PROTOCOL_MAP,
+    PRIV_PROTOCOL_MAP,
+)
+from cloudshell.snmp.core.tools.snmp_security import SnmpSecurity
+from cloudshell.snmp.core.tools.snmp_trasnport import SnmpTransport
+from cloudshell.snmp.snmp_configurator import SnmpConfigurator
+from pysnmp.entity import config
+from pysnmp.proto import rfc1902
+
+from adaptive_timeouts import (
+    SNMP_PROTOCOL,
+    get_adaptive_timeouts,
+    get_timeout_bounds,
+    register_snmp_latency_observer,
+)
+
+from cloudshell.networking.cisco.snmp.cisco_snmp_handler import CiscoSnmpHandler
+
+INCOMING_MSG_EXECPOINT = "rfc3414.processIncomingMsg"
+
+
+def _digest(value):
+    return hashlib.sha256(bytes(value or b"")).hexdigest()
+
+
+class SnmpV3KeyCache:
+    """Per-process cache of SNMPv3 keys and engine IDs of the devices.
+
+    Master keys (the expensive password-to-key hashing) are cached by the
+    protocols and the pass phrases, keys localized for the device engine by
+    the engine ID, user and protocols. Engine ID of the device is learned from
+    the responses, when it changes the keys localized for the old engine
+    are dropped.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._master_keys = {}
+        self._localized_keys = {}
+        self._engine_ids = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_master_keys(self, auth_protocol, auth_key, priv_protocol, priv_key):
+        key = (auth_protocol, _digest(auth_key), priv_protocol, _digest(priv_key))
+        with self._lock:
+            master_keys = self._master_keys.get(key)
+            if master_keys:
+                self.hits += 1
+                return master_keys
+            self.misses += 1
+
+        master_auth_key = config.AUTH_SERVICES[auth_protocol].hash_passphrase(
+            auth_key or b""
+        )
+        master_priv_key = config.PRIV_SERVICES[priv_protocol].hash_passphrase(
+            auth_protocol, priv_key or b""
+        )
+        with self._lock:
+            self._master_keys[key] = master_auth_key, master_priv_key
+        return master_auth_key, master_priv_key
+
+    def get_localized_keys(self, engine_id, user, auth_protocol, priv_protocol, keys):
+        """Get keys localized for the engine from the master keys."""
+        key = (
+            bytes(engine_id),
+            user,
+            auth_protocol,
+            priv_protocol,
+            _digest(keys[0]),
+            _digest(keys[1]),
+        )
+        with self._lock:
+            localized_keys = self._localized_keys.get(key)
+        if localized_keys:
+            return localized_keys
+
+        master_auth_key, master_priv_key = keys
+        engine_id = rfc1902.OctetString(engine_id)
+        localized_keys = (
+            config.AUTH_SERVICES[auth_protocol].localize_key(
+                master_auth_key, engine_id
+            ),
+            config.PRIV_SERVICES[priv_protocol].localize_key(
+                auth_protocol, master_priv_key, engine_id
+            ),
+        )
+        with self._lock:
+            self._localized_keys[key] = localized_keys
+        return localized_keys
+
+    def get_engine_id(self, device):
+        with self._lock:
+            return self._engine_ids.get(device)
+
+    def set_engine_id(self, device, engine_id):
+        """Remember engine ID of the device.
+
+        :return: True if the engine ID of the device was changed
+        """
+        engine_id = bytes(engine_id)
+        with self._lock:
+            old_engine_id = self._engine_ids.get(device)
+            if old_engine_id == engine_id:
+                return False
+            self._engine_ids[device] = engine_id
+            if old_engine_id is not None:
+                self._localized_keys = {
+                    key: value
+                    for key, value in self._localized_keys.items()
+                    if key[0] != old_engine_id
+                }
+            return old_engine_id is not None
+
+
+_key_cache = SnmpV3KeyCache()
+
+
+def get_key_cache():
+    return _key_cache
+
+
+class CachingSnmpSecurity(SnmpSecurity):
+    """Add SNMPv3 user with cached master and localized keys."""
+
+    def __init__(self, py_snmp_params, logger, key_cache):
+        super().__init__(py_snmp_params, logger)
+        self._key_cache = key_cache
+
+    def add_security(self, snmp_engine):
+        snmp_parameters = self._py_snmp_params.snmp_parameters
+        if not hasattr(snmp_parameters, "snmp_password"):
+            return super().add_security(snmp_engine)
+
+        user = self._py_snmp_params.user
+        device = snmp_parameters.ip
+        auth_protocol = AUTH_PROTOCOL_MAP.get(snmp_parameters.snmp_auth_protocol)
+        priv_protocol = PRIV_PROTOCOL_MAP.get(snmp_parameters.snmp_private_key_protocol)
+        auth_key = snmp_parameters.snmp_password
+        priv_key = snmp_parameters.snmp_private_key
+        master_keys = self._key_cache.get_master_keys(
+            auth_protocol,
+            auth_key and rfc1902.OctetString(auth_key),
+            priv_protocol,
+            priv_key and rfc1902.OctetString(priv_key),
+        )
+        config.add_v3_user(
+            snmpEngine=snmp_engine,
+            userName=user,
+            authProtocol=auth_protocol,
+            authKey=master_keys[0],
+            privProtocol=priv_protocol,
+            privKey=master_keys[1],
+            authKeyType=config.USM_KEY_TYPE_MASTER,
+            privKeyType=config.USM_KEY_TYPE_MASTER,
+        )
+
+        engine_id = self._key_cache.get_engine_id(device)
+        if engine_id:
+            engine_id = rfc1902.OctetString(engine_id)
+            localized_keys = self._key_cache.get_localized_keys(
+                engine_id, user, auth_protocol, priv_protocol, master_keys
+            )
+            config.add_v3_user(
+                snmpEngine=snmp_engine,
+                userName=user,
+                authProtocol=auth_protocol,
+                authKey=localized_keys[0],
+                privProtocol=priv_protocol,
+                privKey=localized_keys[1],
+                securityEngineId=engine_id,
+                authKeyType=config.USM_KEY_TYPE_LOCALIZED,
+                privKeyType=config.USM_KEY_TYPE_LOCALIZED,
+            )
+
+        def on_incoming_msg(engine, execpoint, variables, cb_ctx):
+            security_engine_id = variables.get("securityEngineId")
+            if security_engine_id and self._key_cache.set_engine_id(
+                device, security_engine_id
+            ):
+                self._logger.info(
+                    f"SNMP engine ID of {device} changed, cached keys invalidated"
+                )
+
+        snmp_engine.observer.register_observer(on_incoming_msg, INCOMING_MSG_EXECPOINT)
+
+
+class CachingSnmp(Snmp):
+    def __init__(self, key_cache=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._key_cache = key_cache or get_key_cache()
+        self.timeout_bounds = None
+
+    def _get_snmp_timeout(self, device):
+        """Get timeout learned for the device, in 1/100 sec."""
+        if not self.timeout_bounds:
+            return self._snmp_timeout
+        timeout = get_adaptive_timeouts().get_timeout(
+            device, SNMP_PROTOCOL, self._snmp_timeout / 100, *self.timeout_bounds
+        )
+        return int(timeout * 100)
+
+    def _get_snmp_engine(self, pysnmp_params, logger):
+        """Get SNMP engine with the cached SNMPv3 keys and adaptive timeout."""
+        device = pysnmp_params.snmp_parameters.ip
+        snmp_engine = QualiSnmpEngine(
+            msg_pdu_dsp=QualiMsgAndPduDispatcher(), logger=logger
+        )
+        config.add_target_parameters(
+            snmp_engine,
+            "pms",
+            pysnmp_params.user,
+            pysnmp_params.security,
+            pysnmp_params.version,
+        )
+        transport = SnmpTransport(
+            snmp_parameters=pysnmp_params.snmp_parameters, logger=logger
+        )
+        transport.add_udp_endpoint(
+            snmp_engine, self._get_snmp_timeout(device), self._snmp_retry_count
+        )
+        security = CachingSnmpSecurity(pysnmp_params, logger, self._key_cache)
+        security.add_security(snmp_engine)
+        if self.timeout_bounds:
+            register_snmp_latency_observer(snmp_engine, device, get_adaptive_timeouts())
+        return snmp_engine
+
+
+class CiscoIOSSnmpHandler(CiscoSnmpHandler):
+    """SNMP handler that reuses SNMPv3 keys and learns the device timeout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._snmp = CachingSnmp()
+        self._snmp_configurator = SnmpConfigurator(
+            snmp_parameters=self._snmp_parameters,
+            logger=self._logger,
+            snmp=self._snmp,
+        )
+
+    @classmethod
+    def from_config(cls, enable_disable_snmp_flow, conf, logger):
+        snmp_handler = super().from_config(enable_disable_snmp_flow, conf, logger)
+        snmp_handler._snmp.timeout_bounds = get_timeout_bounds(conf, SNMP_PROTOCOL)
+        return snmp_handler
@@ -0,0 +1,41 @@
+#!/usr/bin/python
+import json
+import os
+import tempfile
+
+STATE_DIR_ENV = "CISCO_IOS_SHELL_STATE_DIR"
+STATE_DIR_NAME = "cisco_ios_shell"
+
+
+def get_state_dir():
+    """Directory for the state persisted between driver processes."""
+    state_dir = os.environ.get(STATE_DIR_ENV) or os.path.join(
+        tempfile.gettempdir(), STATE_DIR_NAME
+    )
+    os.makedirs(state_dir, exist_ok=True)
+    return state_dir
+
+
+def get_state_path(file_name):
+    return os.path.join(get_state_dir(), file_name)
+
+
+def load_json_state(path, default=None):
+    """Load the state, return default if the file is missing or corrupted."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {} if default is None else default
+
+
+def save_json_state(path, state):
+    """Save the state atomically so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+import logging
+import random
+import threading
+
+from cloudshell.shell.core.session.logging_session import LoggingSessionContext
+
+from resource_config import CiscoIOSResourceConfig
+
+TRANSCRIPT_MODULES = {
+    "expect_session",
+    "ssh_session",
+    "telnet_session",
+    "tcp_session",
+    "console_ssh",
+    "console_telnet",
+}
+
+
+class TranscriptFilter(logging.Filter):
+    """Drop CLI session transcript records: sent commands and device output."""
+
+    def filter(self, record):  # noqa: A003
+        return record.module not in TRANSCRIPT_MODULES
+
+
+def parse_transcript_modes(value):
+    """Parse CLI Transcript Logging attribute value.
+
+    The value is comma separated modes, "[command=]mode" where mode is "on",
+    "off" or sampling rate from 0 to 1, e.g. "on, get_inventory=0.1, save=off"
+    :rtype: dict
+    """
+    modes = {}
+    for item in filter(None, map(str.strip, (value or "").split(","))):
+        command, _, mode = item.rpartition("=")
+        mode = mode.strip().lower()
+        if mode == "on":
+            rate = 1.0
+        elif mode == "off":
+            rate = 0.0
+        else:
+            try:
+                rate = min(max(float(mode), 0.0), 1.0)
+            except ValueError:
+                continue
+        modes[command.strip() or None] = rate
+    return modes
+
+
+def is_transcript_enabled(value, command=None):
+    """Decide whether the CLI transcript of this command run is logged."""
+    modes = parse_transcript_modes(value)
+    rate = modes.get(command, modes.get(None, 1.0))
+    return rate >= 1.0 or random.random() < rate
+
+
+class TranscriptLoggingSessionContext(LoggingSessionContext):
+    """Logging session context with CLI transcript switchable per command.
+
+    The records are written by the handlers of the resource logger, the
+    transcript filter is added to the logger of the command thread.
+    """
+
+    def __init__(self, context, command=None):
+        super().__init__(context)
+        self._command = command
+
+    def __enter__(self):
+        logger = self.get_logger_for_context(self.context)
+        child = logger.getChild(threading.current_thread().name)
+        for handler in list(child.handlers):
+            if handler not in logger.handlers:
+                child.removeHandler(handler)
+        for handler in logger.handlers:
+            child.addHandler(handler)
+        child.level = logger.level
+        for log_filter in list(child.filters):
+            if isinstance(log_filter, TranscriptFilter):
+                child.removeFilter(log_filter)
+        for log_filter in logger.filters:
+            child.addFilter(log_filter)
+        transcript_mode = CiscoIOSResourceConfig.attribute_from_context(
+            self.context, "cli_transcript_logging"
+        )
+        if not is_transcript_enabled(transcript_mode, self._command):
+            child.addFilter(TranscriptFilter())
+        self._logger = child
+        return child
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from cloudshell.cli.service.cli_service_impl import CliServiceImpl
+from cloudshell.cli.session.session_exceptions import ExpectedSessionException
+
+from adaptive_timeouts import (
+    AdaptiveTimeoutCliService,
+    AdaptiveTimeouts,
+    LatencyHistogram,
+    get_command_class,
+    parse_timeout_bounds,
+)
+
+DEVICE = "10.0.0.1"
+
+
+class TestAdaptiveTimeouts(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "timeouts.json")
+        self.timeouts = AdaptiveTimeouts(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_parse_timeout_bounds(self):
+        self.assertEqual(
+            {"cli": (30, 3600), "snmp": (2.5, 30)},
+            parse_timeout_bounds("cli=30-3600, snmp=2.5-30, ssh=10-1, bad"),
+        )
+        self.assertEqual({}, parse_timeout_bounds("off"))
+
+    def test_get_command_class(self):
+        self.assertEqual("cli:copy", get_command_class("copy running-config tftp:"))
+        self.assertEqual("cli:show", get_command_class(" show version"))
+        self.assertEqual("cli:other", get_command_class("terminal length 0"))
+
+    def test_histogram_percentile(self):
+        # Arrange
+        histogram = LatencyHistogram()
+
+        # Act
+        for _ in range(99):
+            histogram.add(0.2)
+        histogram.add(10)
+
+        # Assert
+        self.assertAlmostEqual(0.2, histogram.percentile(0.5), delta=0.05)
+        self.assertAlmostEqual(10, histogram.percentile(1), delta=2.5)
+        self.assertEqual(100, histogram.samples)
+
+    def test_histogram_fades_old_samples(self):
+        # Arrange
+        histogram = LatencyHistogram()
+
+        # Act
+        for _ in range(LatencyHistogram.MAX_SAMPLES + 1):
+            histogram.add(1)
+
+        # Assert
+        self.assertEqual((LatencyHistogram.MAX_SAMPLES + 1) // 2, histogram.samples)
+
+    def test_get_timeout(self):
+        # Arrange
+        no_data = self.timeouts.get_timeout(DEVICE, "cli:show", 30, 5, 600)
+        self.timeouts.record(DEVICE, "cli:show", 1)
+        few_samples = self.timeouts.get_timeout(DEVICE, "cli:show", 30, 5, 600)
+
+        # Act
+        for _ in range(AdaptiveTimeouts.MIN_SAMPLES):
+            self.timeouts.record(DEVICE, "cli:show", 1)
+            self.timeouts.record(DEVICE, "cli:copy", 1000)
+        show = self.timeouts.get_timeout(DEVICE, "cli:show", 30, 5, 600)
+        copy = self.timeouts.get_timeout(DEVICE, "cli:copy", 30, 5, 600)
+
+        # Assert
+        self.assertEqual(30, no_data)
+        self.assertEqual(30, few_samples)
+        self.assertEqual(5, show)
+        self.assertEqual(600, copy)
+
+    def test_persisted_and_merged(self):
+        # Arrange
+        other_process = AdaptiveTimeouts(self.path)
+
+        # Act
+        self.timeouts.record(DEVICE, "cli:show", 1)
+        other_process.record("10.0.0.2", "snmp", 0.1)
+        self.timeouts.flush()
+        other_process.flush()
+
+        # Assert
+        statistics = AdaptiveTimeouts(self.path)
+        self.assertEqual(1, statistics.get_statistics(DEVICE)["cli:show"]["samples"])
+        self.assertEqual(1, statistics.get_statistics("10.0.0.2")["snmp"]["samples"])
+
+    def test_processes_add_samples(self):
+        # Arrange
+        other_process = AdaptiveTimeouts(self.path)
+
+        # Act
+        for timeouts in (self.timeouts, other_process, self.timeouts):
+            timeouts.record(DEVICE, "cli:show", 1)
+            timeouts.flush()
+
+        # Assert
+        statistics = AdaptiveTimeouts(self.path).get_statistics(DEVICE)
+        self.assertEqual(3, statistics["cli:show"]["samples"])
+        self.assertEqual(3, self.timeouts.get_statistics(DEVICE)["cli:show"]["samples"])
+
+
+@patch.object(CliServiceImpl, "_initialize")
+class TestAdaptiveTimeoutCliService(unittest.TestCase):
+    def setUp(self):
+        self.timeouts = Mock()
+        self.timeouts.get_timeout.return_value = 42
+        self.session = Mock(_timeout=30)
+
+    def _get_cli_service(self):
+        cli_service = AdaptiveTimeoutCliService(
+            self.session, Mock(), Mock(), DEVICE, (5, 600), self.timeouts
+        )
+        cli_service.command_mode = Mock(prompt="#")
+        return cli_service
+
+    def test_send_command_with_learned_timeout(self, mocked_initialize):
+        # Arrange
+        cli_service = self._get_cli_service()
+
+        # Act
+        cli_service.send_command("show version")
+
+        # Assert
+        self.timeouts.get_timeout.assert_called_once_with(
+            DEVICE, "cli:show", 30, 5, 600
+        )
+        self.assertEqual(42, self.session.hardware_expect.call_args.kwargs["timeout"])
+        self.assertEqual(DEVICE, self.timeouts.record.call_args.args[0])
+
+    def test_caller_timeout_is_kept(self, mocked_initialize):
+        # Arrange
+        cli_service = self._get_cli_service()
+
+        # Act
+        cli_service.send_command("show version", timeout=60)
+
+        # Assert
+        self.timeouts.get_timeout.assert_not_called()
+        self.assertEqual(60, self.session.hardware_expect.call_args.kwargs["timeout"])
+        self.timeouts.record.assert_called_once()
+
+    def test_timed_out_command_is_not_recorded(self, mocked_initialize):
+        # Arrange
+        cli_service = self._get_cli_service()
+        self.session.hardware_expect.side_effect = ExpectedSessionException("timeout")
+
+        # Act
+        with self.assertRaises(ExpectedSessionException):
+            cli_service.send_command("copy running-config tftp:")
+
+        # Assert
+        self.timeouts.get_timeout.assert_called_once_with(
+            DEVICE, "cli:copy", 30, 5, 600
+        )
+        self.timeouts.record.assert_not_called()
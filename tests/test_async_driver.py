@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+import asyncio
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from async_driver import (
+    MAX_WORKERS,
+    MAX_WORKERS_ENV,
+    AsyncCiscoIOSShellDriver,
+    get_locked_executor,
+    get_max_workers,
+    get_shared_executor,
+)
+
+
+class TestAsyncCiscoIOSShellDriver(unittest.TestCase):
+    def setUp(self):
+        self.driver = Mock()
+        self.async_driver = AsyncCiscoIOSShellDriver(self.driver)
+
+    def test_shared_executor(self):
+        self.assertIs(get_shared_executor(), get_shared_executor())
+        self.assertIs(get_shared_executor(), AsyncCiscoIOSShellDriver(Mock())._executor)
+
+    def test_get_max_workers(self):
+        with patch.dict(os.environ, {MAX_WORKERS_ENV: "16"}):
+            self.assertEqual(16, get_max_workers())
+        with patch.dict(os.environ, {MAX_WORKERS_ENV: "x"}):
+            self.assertEqual(MAX_WORKERS, get_max_workers())
+
+    def test_locked_commands_use_locked_executor(self):
+        # Arrange
+        thread_names = []
+        self.driver.get_inventory.side_effect = lambda ctx: thread_names.append(
+            threading.current_thread().name
+        )
+        self.driver.health_check.side_effect = lambda ctx: thread_names.append(
+            threading.current_thread().name
+        )
+
+        # Act
+        asyncio.run(self.async_driver.get_inventory(Mock()))
+        asyncio.run(self.async_driver.health_check(Mock()))
+
+        # Assert
+        self.assertIs(get_locked_executor(), self.async_driver._locked_executor)
+        self.assertTrue(thread_names[0].startswith("cisco-ios-locked"))
+        self.assertFalse(thread_names[1].startswith("cisco-ios-locked"))
+
+    def test_health_check(self):
+        # Arrange
+        context = Mock()
+        self.driver.health_check.return_value = "passed"
+
+        # Act
+        result = asyncio.run(self.async_driver.health_check(context))
+
+        # Assert
+        self.assertEqual("passed", result)
+        self.driver.health_check.assert_called_once_with(context)
+
+    def test_save(self):
+        # Arrange
+        context = Mock()
+        self.driver.save.return_value = "file-name"
+
+        # Act
+        result = asyncio.run(
+            self.async_driver.save(
+                context,
+                folder_path="ftp://server/folder",
+                configuration_type="running",
+                vrf_management_name="",
+            )
+        )
+
+        # Assert
+        self.assertEqual("file-name", result)
+        self.driver.save.assert_called_once_with(
+            context,
+            folder_path="ftp://server/folder",
+            configuration_type="running",
+            vrf_management_name="",
+        )
+
+    def test_commands_run_concurrently(self):
+        # Arrange
+        barrier = threading.Barrier(3, timeout=5)
+        self.driver.run_custom_command.side_effect = lambda ctx, cmd: barrier.wait()
+        async_driver = AsyncCiscoIOSShellDriver(
+            self.driver, ThreadPoolExecutor(max_workers=3)
+        )
+
+        async def run():
+            return await asyncio.gather(
+                *(async_driver.run_custom_command(Mock(), "show ver") for _ in range(3))
+            )
+
+        # Act
+        results = asyncio.run(run())
+
+        # Assert
+        self.assertEqual(3, len(results))
+        self.assertEqual(3, self.driver.run_custom_command.call_count)
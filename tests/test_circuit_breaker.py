@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+import unittest
+from unittest.mock import Mock, patch
+
+from cloudshell.cli.service.session_manager_impl import SessionManagerImpl
+from cloudshell.shell.core.driver_utils import GlobalLock
+
+from circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerOpenException,
+    circuit_checked,
+    get_circuit_breaker,
+)
+from cli_transport_cache import TransportCachingSessionManager
+from driver import CiscoIOSShellDriver
+
+
+@patch("circuit_breaker.time.monotonic")
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.circuit_breaker = CircuitBreaker(
+            "10.0.0.1", 2, base_backoff=30, max_backoff=100
+        )
+
+    def _open(self):
+        self.circuit_breaker.allow()
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.allow()
+        return self.circuit_breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self, mocked_time):
+        # Arrange
+        mocked_time.return_value = 100
+
+        # Act
+        opened = self._open()
+
+        # Assert
+        self.assertTrue(opened)
+        self.assertEqual(OPEN, self.circuit_breaker.state)
+        self.assertRaises(CircuitBreakerOpenException, self.circuit_breaker.allow)
+        self.assertRaises(CircuitBreakerOpenException, self.circuit_breaker.check)
+        statistics = self.circuit_breaker.get_statistics()
+        self.assertEqual(2, statistics["rejected"])
+        self.assertEqual(30, statistics["retry_in"])
+
+    def test_success_resets_failures(self, mocked_time):
+        # Arrange
+        mocked_time.return_value = 100
+        self.circuit_breaker.record_failure()
+
+        # Act
+        self.circuit_breaker.record_success()
+        opened = self.circuit_breaker.record_failure()
+
+        # Assert
+        self.assertFalse(opened)
+        self.assertEqual(CLOSED, self.circuit_breaker.state)
+
+    def test_half_open_allows_one_probe(self, mocked_time):
+        # Arrange
+        mocked_time.return_value = 100
+        self._open()
+        mocked_time.return_value = 130
+
+        # Act
+        self.circuit_breaker.check()
+        self.circuit_breaker.allow()
+
+        # Assert
+        self.assertEqual(HALF_OPEN, self.circuit_breaker.state)
+        self.assertRaises(CircuitBreakerOpenException, self.circuit_breaker.allow)
+        self.circuit_breaker.record_success()
+        self.assertEqual(CLOSED, self.circuit_breaker.state)
+
+    def test_failed_probe_doubles_backoff(self, mocked_time):
+        # Arrange
+        mocked_time.return_value = 100
+        self._open()
+
+        # Act
+        backoffs = []
+        for now in (130, 190, 290, 390):
+            mocked_time.return_value = now
+            self.circuit_breaker.allow()
+            self.circuit_breaker.record_failure()
+            backoffs.append(self.circuit_breaker.get_statistics()["retry_in"])
+
+        # Assert
+        self.assertEqual([60, 100, 100, 100], backoffs)
+        self.assertEqual(5, self.circuit_breaker.get_statistics()["trips"])
+
+    def test_disabled(self, mocked_time):
+        # Arrange
+        self.circuit_breaker.failure_threshold = 0
+
+        # Act
+        opened = self._open()
+
+        # Assert
+        self.assertFalse(opened)
+        self.circuit_breaker.allow()
+        self.assertEqual(CLOSED, self.circuit_breaker.state)
+
+
+class TestCircuitBreakerIntegration(unittest.TestCase):
+    @patch.object(SessionManagerImpl, "new_session", side_effect=OSError("timed out"))
+    def test_session_manager_fails_fast(self, mocked_new_session):
+        # Arrange
+        circuit_breaker = CircuitBreaker("10.0.0.2", 2)
+        session_manager = TransportCachingSessionManager(Mock(), circuit_breaker)
+        session = Mock(host="10.0.0.2")
+
+        # Act
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                session_manager.new_session(session, "#", Mock())
+        with self.assertRaises(CircuitBreakerOpenException):
+            session_manager.new_session(session, "#", Mock())
+
+        # Assert
+        self.assertEqual(2, mocked_new_session.call_count)
+
+    def test_driver_command_fails_fast(self):
+        # Arrange
+        circuit_breaker = get_circuit_breaker("10.0.0.3", 1)
+        circuit_breaker.record_failure()
+        command = Mock()
+        context = Mock()
+        context.resource.address = "10.0.0.3"
+
+        # Act
+        with self.assertRaises(CircuitBreakerOpenException):
+            circuit_checked(command)(Mock(), context)
+
+        # Assert
+        command.assert_not_called()
+
+    def test_locked_command_fails_fast_without_global_lock(self):
+        # Arrange
+        circuit_breaker = get_circuit_breaker("10.0.0.4", 1)
+        circuit_breaker.record_failure()
+        context = Mock()
+        context.resource.address = "10.0.0.4"
+        driver = CiscoIOSShellDriver()
+
+        # Act
+        with GlobalLock._lock:
+            with self.assertRaises(CircuitBreakerOpenException):
+                driver.load_firmware(context, "tftp://10.0.0.1/ios.bin", "")
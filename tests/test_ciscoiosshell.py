@@ -1,6 +1,7 @@
 #!/usr/bin/env python
+import json
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from cloudshell.shell.core.driver_context import ResourceCommandContext
 
@@ -9,12 +10,12 @@ from driver import CiscoIOSShellDriver
 
 @patch("driver.CloudShellSessionContext")
 @patch("driver.LoggingSessionContext")
-@patch("driver.NetworkingResourceConfig")
+@patch("driver.CiscoIOSResourceConfig")
 @patch(
     "cloudshell.shell.core.driver_context.ResourceCommandContext",
     autospec=ResourceCommandContext,
 )
-@patch("driver.CiscoCli")
+@patch("driver.CiscoIOSCli")
 class TestCiscoIOSShellDriver(unittest.TestCase):
     def setUp(self):
         self.driver = CiscoIOSShellDriver()
@@ -573,6 +574,118 @@ class TestCiscoIOSShellDriver(unittest.TestCase):
             mode="shallow", custom_params=None
         )
 
+    @patch("driver.ConfigurationFlow")
+    @patch("driver.OrchestrationSaveRestore")
+    @patch("driver.FleetOperationsFlow")
+    def test_orchestration_save_fleet(
+        self,
+        mocked_fleet_flow,
+        mocked_orch_service,
+        mocked_class,
+        mocked_cli,
+        mocked_context,
+        mocked_resource_details,
+        mocked_logger,
+        mocked_api,
+    ):
+        # Arrange
+        mocked_fleet_flow.MAX_WORKERS = 10
+        mocked_fleet_flow.MAX_CONNECTIONS_PER_SERVER = 5
+        mocked_fleet_flow.return_value.run.return_value = (
+            {"r1": "saved"},
+            {"r2": "error"},
+            {"r1": 1.0},
+        )
+
+        # Act
+        self.driver.initialize(mocked_context)
+        result = self.driver.orchestration_save_fleet(
+            mocked_context, "r1, r2", "", None, "", "2"
+        )
+
+        # Assert
+        result = json.loads(result)
+        self.assertEqual({"r1": "saved"}, result["saved_artifacts"])
+        self.assertEqual({"r2": "error"}, result["failed"])
+        mocked_fleet_flow.assert_called_once_with(
+            logger=mocked_logger.return_value.__enter__.return_value,
+            api=mocked_api.return_value.get_api.return_value,
+            context=mocked_context,
+            max_workers=10,
+            max_connections_per_server=2,
+        )
+        self.assertEqual(
+            ["r1", "r2"], mocked_fleet_flow.return_value.run.call_args.args[0]
+        )
+
+    @patch("driver.ConfigurationFlow")
+    @patch("driver.OrchestrationSaveRestore")
+    @patch("driver.FleetOperationsFlow")
+    def test_orchestration_save_fleet_operation(
+        self,
+        mocked_fleet_flow,
+        mocked_orch_service,
+        mocked_class,
+        mocked_cli,
+        mocked_context,
+        mocked_resource_details,
+        mocked_logger,
+        mocked_api,
+    ):
+        # Arrange
+        mocked_fleet_flow.return_value.run.return_value = ({}, {}, {})
+        self.driver.initialize(mocked_context)
+        self.driver.orchestration_save_fleet(mocked_context, "r1", "", None, "1", "1")
+        operation = mocked_fleet_flow.return_value.run.call_args.kwargs["operation"]
+        resource_config = Mock()
+        transfer_slot = Mock()
+        mocked_class.return_value.orchestration_save.side_effect = Exception("failed")
+
+        # Act
+        with self.assertRaises(Exception):
+            operation(resource_config, transfer_slot)
+
+        # Assert
+        mocked_cli.assert_called_with(resource_config)
+        self.assertIs(transfer_slot, mocked_class.call_args.kwargs["transfer_slot"])
+        mocked_cli.return_value.close.assert_called_once()
+
+    @patch("driver.device_lock")
+    @patch("driver.FirmwareFlow")
+    @patch("driver.FleetOperationsFlow")
+    def test_load_firmware_fleet_operation_locks_device(
+        self,
+        mocked_fleet_flow,
+        mocked_class,
+        mocked_device_lock,
+        mocked_cli,
+        mocked_context,
+        mocked_resource_details,
+        mocked_logger,
+        mocked_api,
+    ):
+        # Arrange
+        mocked_fleet_flow.return_value.run_in_waves.return_value = ({}, {}, {}, [])
+        self.driver.initialize(mocked_context)
+        self.driver.load_firmware_fleet(
+            mocked_context, "r1", "tftp://server/image.bin", "", "", "1", "", "1"
+        )
+        run_in_waves = mocked_fleet_flow.return_value.run_in_waves
+        operation = run_in_waves.call_args.kwargs["operation"]
+        resource_config = Mock(address="10.0.0.1")
+        lock = mocked_device_lock.return_value
+        lock.__enter__.side_effect = (
+            lambda: mocked_class.return_value.load_firmware.assert_not_called()
+        )
+
+        # Act
+        operation(resource_config, Mock())
+
+        # Assert
+        mocked_device_lock.assert_called_once_with("10.0.0.1")
+        mocked_class.return_value.load_firmware.assert_called_once()
+        lock.__exit__.assert_called_once()
+
     @patch("driver.ConfigurationFlow")
     @patch("driver.OrchestrationSaveRestore")
     def test_orchestration_restore_no_custom_params(
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from cloudshell.cli.service.session_manager_impl import SessionManagerException
+
+from cli_transport_cache import (
+    CiscoIOSCli,
+    CliTransportCache,
+    TransportCachingSessionManager,
+    get_transport_id,
+)
+
+
+class SSHSession(Mock):
+    pass
+
+
+class TelnetSession(Mock):
+    pass
+
+
+class TestCliTransportCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "transports.json")
+        self.cache = CliTransportCache(self.path, max_failures=2)
+        self.manager = TransportCachingSessionManager(self.cache)
+        self.logger = Mock()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _get_sessions(self, ssh_works=False, telnet_works=True):
+        ssh = SSHSession(host="10.0.0.1", port=22, session_type="SSH")
+        telnet = TelnetSession(host="10.0.0.1", port=23, session_type="TELNET")
+        if not ssh_works:
+            ssh.connect.side_effect = Exception("timeout")
+        if not telnet_works:
+            telnet.connect.side_effect = Exception("refused")
+        return [ssh, telnet]
+
+    def test_cached_transport_is_tried_first(self):
+        # Arrange
+        self.manager.new_session(self._get_sessions(), "#", self.logger)
+        ssh, telnet = self._get_sessions()
+
+        # Act
+        session = self.manager.new_session([ssh, telnet], "#", self.logger)
+
+        # Assert
+        self.assertIs(telnet, session)
+        ssh.connect.assert_not_called()
+        statistics = self.cache.get_statistics("10.0.0.1")
+        self.assertEqual(get_transport_id(telnet), statistics["transport"])
+        self.assertEqual(1, statistics["hits"])
+
+    def test_cache_is_persisted(self):
+        # Act
+        self.manager.new_session(self._get_sessions(), "#", self.logger)
+
+        # Assert
+        cache = CliTransportCache(self.path)
+        self.assertEqual("TelnetSession@10.0.0.1:23", cache.get_transport("10.0.0.1"))
+
+    def test_cached_transport_expires_after_failures(self):
+        # Arrange
+        self.manager.new_session(self._get_sessions(), "#", self.logger)
+
+        # Act
+        for _ in range(2):
+            with self.assertRaises(SessionManagerException):
+                self.manager.new_session(
+                    self._get_sessions(telnet_works=False), "#", self.logger
+                )
+
+        # Assert
+        self.assertIsNone(self.cache.get_transport("10.0.0.1"))
+        self.assertEqual(1, self.cache.get_statistics("10.0.0.1")["expired"])
+
+    def test_processes_merge_entries(self):
+        # Arrange
+        other_process = CliTransportCache(self.path)
+        telnet_id = "TelnetSession@10.0.0.1:23"
+        self.cache.record_success("10.0.0.1", telnet_id, 5)
+        other_process.record_success("10.0.0.1", telnet_id, 5)
+
+        # Act
+        self.cache.record_success("10.0.0.1", telnet_id, 5)
+        other_process.record_success("10.0.0.2", telnet_id, 1)
+        other_process.record_success("10.0.0.1", telnet_id, 5)
+
+        # Assert
+        statistics = CliTransportCache(self.path).get_statistics()
+        self.assertEqual(2, statistics["10.0.0.1"]["hits"])
+        self.assertEqual(10, statistics["10.0.0.1"]["saved_connect_time"])
+        self.assertIn("10.0.0.2", statistics)
+
+
+class TestCiscoIOSCli(unittest.TestCase):
+    def test_close_disconnects_pooled_sessions(self):
+        # Arrange
+        resource_config = Mock(
+            address="10.0.0.1",
+            circuit_breaker_threshold="3",
+            sessions_concurrency_limit="2",
+            global_sessions_limit=False,
+            adaptive_timeouts="",
+        )
+        cli = CiscoIOSCli(resource_config, transport_cache=Mock())
+        sessions = [Mock(), Mock()]
+        for session in sessions:
+            cli._session_pool._session_manager._existing_sessions.append(session)
+            cli._session_pool._pool.put(session)
+        sessions[1].disconnect.side_effect = EOFError()
+
+        # Act
+        cli.close(Mock())
+
+        # Assert
+        self.assertTrue(cli._session_pool._pool.empty())
+        self.assertEqual(
+            0, cli._session_pool._session_manager.existing_sessions_count()
+        )
+        for session in sessions:
+            session.disconnect.assert_called_once()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+import logging
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from command_profiler import (
+    PROFILING_ENV,
+    get_log_dir,
+    get_profiling_threshold,
+    profiled,
+)
+from transcript_logging import TranscriptLoggingSessionContext
+
+
+class Driver:
+    @profiled
+    def save(self, context, duration):
+        time.sleep(duration)
+        return "saved"
+
+
+class TestCommandProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.context = Mock()
+        self.context.resource.name = "router"
+        self.context.resource.model = "Cisco IOS Router 2G"
+        self.context.resource.attributes = {
+            "Cisco IOS Router 2G.Command Profiling Threshold": "0.05"
+        }
+        self.logger = logging.getLogger("test_command_profiler")
+        self.file_handler = logging.FileHandler(
+            os.path.join(self.tmp_dir.name, "router.log")
+        )
+        self.logger.addHandler(self.file_handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.file_handler)
+        self.file_handler.close()
+        self.tmp_dir.cleanup()
+
+    def test_get_profiling_threshold(self):
+        # Arrange
+        context = Mock()
+        context.resource.model = "Cisco IOS Router 2G"
+        context.resource.attributes = {
+            "Cisco IOS Router 2G.Command Profiling Threshold": "0"
+        }
+
+        # Act
+        disabled = get_profiling_threshold(context)
+        with patch.dict(os.environ, {PROFILING_ENV: "2.5"}):
+            from_env = get_profiling_threshold(context)
+
+        # Assert
+        self.assertIsNone(disabled)
+        self.assertEqual(2.5, from_env)
+        self.assertEqual(0.05, get_profiling_threshold(self.context))
+
+    def test_get_log_dir_of_parent_logger(self):
+        # Act
+        log_dir = get_log_dir(self.logger.getChild("thread"))
+
+        # Assert
+        self.assertEqual(self.tmp_dir.name, log_dir)
+
+    @patch.object(TranscriptLoggingSessionContext, "get_logger_for_context")
+    def test_slow_command_profile_saved(self, mocked_get_logger):
+        # Arrange
+        mocked_get_logger.return_value = self.logger
+
+        # Act
+        result = Driver().save(self.context, 0.1)
+
+        # Assert
+        self.assertEqual("saved", result)
+        files = sorted(os.listdir(self.tmp_dir.name))
+        self.assertEqual(3, len(files))
+        self.assertTrue(files[0].startswith("router--save--"))
+        self.assertTrue(files[0].endswith(".memory.txt"))
+        self.assertTrue(files[1].endswith(".prof"))
+
+    @patch.object(TranscriptLoggingSessionContext, "get_logger_for_context")
+    def test_fast_command_not_saved(self, mocked_get_logger):
+        # Act
+        result = Driver().save(self.context, 0)
+
+        # Assert
+        self.assertEqual("saved", result)
+        mocked_get_logger.assert_not_called()
+        self.assertEqual(["router.log"], os.listdir(self.tmp_dir.name))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from command_scheduler import (
+    CommandScheduler,
+    CommandSchedulerException,
+    get_reservation_id,
+    scheduled,
+)
+
+
+class TestCommandScheduler(unittest.TestCase):
+    def _run_queued(self, scheduler, commands):
+        """Hold the only slot, queue commands and return dispatch order."""
+        order = []
+
+        def worker(command, reservation_id):
+            with scheduler.schedule(command, reservation_id):
+                order.append((command, reservation_id))
+
+        with scheduler.schedule("save", "blocker"):
+            threads = []
+            for command, reservation_id in commands:
+                thread = threading.Thread(target=worker, args=(command, reservation_id))
+                thread.start()
+                threads.append(thread)
+                while scheduler.get_statistics()["queue_depth"] < len(threads):
+                    time.sleep(0.01)
+        for thread in threads:
+            thread.join(5)
+        return order
+
+    def test_high_priority_dispatched_first(self):
+        # Arrange
+        scheduler = CommandScheduler(max_concurrency=1, queue_timeout=10)
+
+        # Act
+        order = self._run_queued(
+            scheduler, [("save", "r1"), ("restore", "r1"), ("health_check", "r2")]
+        )
+
+        # Assert
+        self.assertEqual(
+            [("health_check", "r2"), ("save", "r1"), ("restore", "r1")], order
+        )
+
+    def test_fair_queuing_across_reservations(self):
+        # Arrange
+        scheduler = CommandScheduler(max_concurrency=1, queue_timeout=10)
+
+        # Act
+        order = self._run_queued(
+            scheduler, [("save", "r1"), ("save", "r1"), ("save", "r2")]
+        )
+
+        # Assert
+        self.assertEqual([("save", "r1"), ("save", "r2"), ("save", "r1")], order)
+
+    def test_queue_timeout(self):
+        # Arrange
+        scheduler = CommandScheduler(max_concurrency=1, queue_timeout=0.1)
+
+        # Act
+        with scheduler.schedule("save"):
+            with self.assertRaises(CommandSchedulerException):
+                with scheduler.schedule("health_check"):
+                    pass
+
+        # Assert
+        statistics = scheduler.get_statistics()
+        self.assertEqual(1, statistics["timed_out"])
+        self.assertEqual(0, statistics["queue_depth"])
+
+    def test_fail_fast_rejection(self):
+        # Arrange
+        scheduler = CommandScheduler(max_concurrency=1, queue_timeout=10)
+        scheduler._service_times.append(60)
+
+        # Act
+        with scheduler.schedule("save"):
+            with self.assertRaises(CommandSchedulerException):
+                with scheduler.schedule("restore"):
+                    pass
+
+        # Assert
+        self.assertEqual(1, scheduler.get_statistics()["rejected"])
+
+    def test_concurrency_limit(self):
+        # Arrange
+        scheduler = CommandScheduler(max_concurrency=2, queue_timeout=10)
+
+        # Act
+        with scheduler.schedule("save"):
+            with scheduler.schedule("save"):
+                running = scheduler.get_statistics()["running"]
+
+        # Assert
+        self.assertEqual(2, running)
+        self.assertEqual(2, scheduler.get_statistics()["completed"])
+
+    def test_next_ticket_dispatched_when_slots_free_at_once(self):
+        # Arrange
+        scheduler = CommandScheduler(max_concurrency=2, queue_timeout=5)
+        started = [scheduler._acquire("save", "r1", None) for _ in range(2)]
+        threads = [
+            threading.Thread(target=scheduler._acquire, args=("save", "r2", None))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        while scheduler.get_statistics()["queue_depth"] < 2:
+            time.sleep(0.01)
+
+        # Act
+        released = time.time()
+        with scheduler._condition:
+            for slot_started in started:
+                scheduler._release(slot_started)
+        for thread in threads:
+            thread.join(5)
+
+        # Assert
+        self.assertLess(time.time() - released, 1)
+        self.assertEqual(2, scheduler.get_statistics()["running"])
+
+    def test_scheduled_decorator(self):
+        # Arrange
+        driver = Mock(_scheduler=CommandScheduler())
+        context = Mock()
+        context.reservation.reservation_id = "reservation"
+        func = Mock(__name__="save", return_value="result")
+
+        # Act
+        result = scheduled(func)(driver, context, "arg")
+
+        # Assert
+        self.assertEqual("result", result)
+        func.assert_called_once_with(driver, context, "arg")
+        self.assertEqual(1, driver._scheduler.get_statistics()["completed"])
+
+    def test_get_reservation_id_without_reservation(self):
+        self.assertEqual("", get_reservation_id(object()))
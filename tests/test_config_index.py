@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from cloudshell.shell.flows.configuration.basic_flow import ConfigurationType
+from cloudshell.shell.flows.utils.url import RemoteURL
+
+from config_index import SavedConfigsIndex, index_saved_config, parse_config_sections
+
+CONFIG = """Building configuration...
+
+Current configuration : 1024 bytes
+!
+hostname {hostname}
+!
+ip access-list extended ACL-MGMT
+ permit tcp 10.0.0.0 0.0.0.255 any eq 22
+ deny   ip any any log
+!
+vlan 300
+ name servers
+!
+interface Vlan300
+ ip address 10.3.0.{host} 255.255.255.0
+!
+banner motd ^C
+Authorized access only
+^C
+ntp server {ntp}
+end
+"""
+
+
+def get_config(hostname, host, ntp):
+    return CONFIG.format(hostname=hostname, host=host, ntp=ntp)
+
+
+class TestSavedConfigsIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = SavedConfigsIndex(os.path.join(self.tmp_dir.name, "index.db"))
+        self.index.add_config(
+            "r1", "running", "r1-running", get_config("r1", 1, "10.0.0.1")
+        )
+        self.index.add_config(
+            "r2", "running", "r2-running", get_config("r2", 2, "10.0.0.2")
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_parse_config_sections(self):
+        # Act
+        lines = parse_config_sections(get_config("r1", 1, "10.0.0.1"))
+
+        # Assert
+        self.assertEqual(
+            [
+                ("hostname r1", "hostname r1"),
+                (
+                    "ip access-list extended ACL-MGMT",
+                    "ip access-list extended ACL-MGMT",
+                ),
+                (
+                    "ip access-list extended ACL-MGMT",
+                    "permit tcp 10.0.0.0 0.0.0.255 any eq 22",
+                ),
+                ("ip access-list extended ACL-MGMT", "deny   ip any any log"),
+                ("vlan 300", "vlan 300"),
+                ("vlan 300", "name servers"),
+                ("interface Vlan300", "interface Vlan300"),
+                ("interface Vlan300", "ip address 10.3.0.1 255.255.255.0"),
+                ("banner motd ^C", "banner motd ^C"),
+                ("banner motd ^C", "Authorized access only"),
+                ("ntp server 10.0.0.1", "ntp server 10.0.0.1"),
+            ],
+            lines,
+        )
+
+    def test_query_exact_line(self):
+        # Act
+        result = self.index.query(line="ntp server 10.0.0.2")
+
+        # Assert
+        self.assertEqual(["r2"], [r["resource"] for r in result])
+        self.assertEqual(
+            [{"section": "ntp server 10.0.0.2", "line": "ntp server 10.0.0.2"}],
+            result[0]["matches"],
+        )
+
+    def test_query_wildcards_and_section(self):
+        # Act
+        acl = self.index.query(line="ip access-list * ACL-MGMT")
+        vlan = self.index.query(line="ip address *", section="interface Vlan300")
+        startup = self.index.query(line="vlan 300", configuration_type="startup")
+
+        # Assert
+        self.assertEqual(["r1", "r2"], [r["resource"] for r in acl])
+        self.assertEqual(
+            ["ip address 10.3.0.2 255.255.255.0"],
+            [m["line"] for m in vlan[1]["matches"]],
+        )
+        self.assertEqual([], startup)
+
+    def test_new_save_replaces_config(self):
+        # Act
+        self.index.add_config(
+            "r1", "running", "r1-running-2", get_config("r1", 1, "10.0.0.2")
+        )
+
+        # Assert
+        result = self.index.query(line="ntp server 10.0.0.2")
+        self.assertEqual(["r1", "r2"], [r["resource"] for r in result])
+        self.assertEqual("r1-running-2", result[0]["file_name"])
+        self.assertEqual([], self.index.query(line="ntp server 10.0.0.1"))
+
+    @patch("config_index.ConfigArtifactStore")
+    def test_index_saved_config(self, mocked_store):
+        # Arrange
+        store = MagicMock()
+        store.read.return_value = get_config("r3", 3, "10.0.0.3").encode()
+        mocked_store.return_value.__enter__.return_value = store
+        mocked_store.is_supported.return_value = True
+        url = RemoteURL.from_str("ftp://server/configs/r3-running")
+        resource_config = Mock(address="10.1.1.3")
+        resource_config.name = "r3"
+
+        # Act
+        result = index_saved_config(
+            url, resource_config, ConfigurationType.RUNNING, Mock(), self.index
+        )
+
+        # Assert
+        self.assertTrue(result)
+        store.read.assert_called_once_with("r3-running")
+        indexed = self.index.query(line="hostname r3")
+        self.assertEqual("10.1.1.3", indexed[0]["address"])
+        self.assertEqual("r3-running", indexed[0]["file_name"])
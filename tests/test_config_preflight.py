@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from cloudshell.shell.flows.utils.url import RemoteURL
+
+from config_artifacts import get_config_digest, load_config_digest, record_config_digest
+from config_preflight import ConfigPreflightException, check_config, preflight_config
+
+CONFIG = b"""!
+version 15.2
+hostname r1
+!
+interface GigabitEthernet0/1
+ ip address 10.0.0.1 255.255.255.0
+!
+end
+"""
+
+
+class TestCheckConfig(unittest.TestCase):
+    def test_valid_config(self):
+        self.assertEqual(
+            [],
+            check_config(
+                CONFIG, "r1.lab.local", "15.2(4)M3", get_config_digest(CONFIG)
+            ),
+        )
+        self.assertEqual([], check_config(CONFIG))
+
+    def test_truncated_config(self):
+        # Act
+        problems = check_config(CONFIG[:-5], digest=get_config_digest(CONFIG))
+
+        # Assert
+        self.assertEqual(2, len(problems))
+        self.assertIn("size or hash differs", problems[0])
+        self.assertIn("truncated", problems[1])
+
+    def test_other_device_config(self):
+        # Act
+        problems = check_config(CONFIG, "r2", "17.3.4a")
+
+        # Assert
+        self.assertEqual(
+            [
+                "config is for host r1, the device is r2",
+                "config is for version 15.2, the device runs 17.3.4a",
+            ],
+            problems,
+        )
+
+    def test_snippet_checked_for_integrity_only(self):
+        # Arrange
+        snippet = b"interface GigabitEthernet0/2\n description uplink\n"
+
+        # Act
+        problems = check_config(snippet, "r2", "17.3.4a", full_config=False)
+
+        # Assert
+        self.assertEqual([], problems)
+        self.assertEqual(
+            ["config isn't a text file"],
+            check_config(b"\x00\x01", full_config=False),
+        )
+
+    def test_not_config(self):
+        self.assertEqual(["config is empty"], check_config(b" \n"))
+        self.assertEqual(["config isn't a text file"], check_config(b"\x7fELF\x00"))
+
+
+class TestConfigDigests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "digests.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_record_and_load(self):
+        # Arrange
+        url = RemoteURL.from_str("ftp://Server/configs/r1-running")
+        other_url = RemoteURL.from_str("ftp://server/configs/r1-running-2")
+
+        # Act
+        record_config_digest(url, CONFIG, path=self.path)
+
+        # Assert
+        digest = load_config_digest(
+            RemoteURL.from_str("ftp://server/configs/r1-running"), path=self.path
+        )
+        self.assertEqual(len(CONFIG), digest["size"])
+        self.assertEqual(get_config_digest(CONFIG)["sha256"], digest["sha256"])
+        self.assertIsNone(load_config_digest(other_url, path=self.path))
+
+
+@patch("config_preflight.load_config_digest", return_value=None)
+@patch("config_preflight.ConfigArtifactStore")
+class TestPreflightConfig(unittest.TestCase):
+    def setUp(self):
+        self.resource_config = Mock(system_name="r1", os_version="15.2(4)M3")
+
+    def _read(self, mocked_store, data):
+        store = MagicMock()
+        store.read.return_value = data
+        mocked_store.return_value.__enter__.return_value = store
+        mocked_store.is_supported.return_value = True
+        return store
+
+    def test_config_passes(self, mocked_store, mocked_digest):
+        # Arrange
+        store = self._read(mocked_store, CONFIG)
+        url = RemoteURL.from_str("ftp://server/configs/r1-running")
+
+        # Act
+        result = preflight_config(url, self.resource_config, Mock())
+
+        # Assert
+        self.assertTrue(result)
+        store.read.assert_called_once_with("r1-running")
+
+    def test_other_device_config_rejected(self, mocked_store, mocked_digest):
+        # Arrange
+        self._read(mocked_store, CONFIG)
+        self.resource_config.system_name = "r2"
+        url = RemoteURL.from_str("ftp://server/configs/r1-running")
+
+        # Act
+        with self.assertRaises(ConfigPreflightException) as context:
+            preflight_config(url, self.resource_config, Mock())
+
+        # Assert
+        self.assertIn("config is for host r1", context.exception.args[1])
+
+    def test_unreachable_server_not_checked(self, mocked_store, mocked_digest):
+        # Arrange
+        mocked_store.is_supported.return_value = True
+        mocked_store.return_value.__enter__.side_effect = OSError("unreachable")
+        url = RemoteURL.from_str("ftp://server/configs/r1-running")
+        logger = Mock()
+
+        # Act
+        result = preflight_config(url, self.resource_config, logger)
+
+        # Assert
+        self.assertFalse(result)
+        logger.warning.assert_called_once()
+
+    def test_tftp_not_checked(self, mocked_store, mocked_digest):
+        # Arrange
+        mocked_store.is_supported.return_value = False
+        url = RemoteURL.from_str("tftp://server/configs/r1-running")
+
+        # Act
+        result = preflight_config(url, self.resource_config, Mock())
+
+        # Assert
+        self.assertFalse(result)
+        mocked_store.assert_not_called()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from cloudshell.shell.flows.configuration.basic_flow import (
+    ConfigurationType,
+    RestoreMethod,
+)
+from cloudshell.shell.flows.utils.url import RemoteURL
+
+from config_preflight import ConfigPreflightException
+from configuration_flow import CiscoIOSConfigurationFlow, SavedConfigsCache
+
+from cloudshell.networking.cisco.flows.cisco_configuration_flow import (
+    CiscoConfigurationFlow,
+)
+
+
+@patch.object(CiscoConfigurationFlow, "_restore_flow")
+@patch.object(CiscoConfigurationFlow, "_save_flow", return_value=None)
+class TestCiscoIOSConfigurationFlow(unittest.TestCase):
+    def setUp(self):
+        self.resource_config = Mock(
+            address="10.0.0.10",
+            skip_unchanged_save=False,
+            index_saved_configs=False,
+            restore_preflight=False,
+        )
+        self.flow = CiscoIOSConfigurationFlow(MagicMock(), self.resource_config, Mock())
+
+    def test_save_in_transfer_slot(self, mocked_save, _):
+        # Arrange
+        transfer_slot = MagicMock()
+        transfer_slot.__enter__.side_effect = lambda: mocked_save.assert_not_called()
+        transfer_slot.__exit__.side_effect = lambda *args: mocked_save.assert_called()
+        flow = CiscoIOSConfigurationFlow(
+            MagicMock(), self.resource_config, Mock(), transfer_slot
+        )
+        url = RemoteURL.from_str("ftp://server/configs/r-running")
+
+        # Act
+        flow._save_flow(url, ConfigurationType.RUNNING, None)
+
+        # Assert
+        transfer_slot.__enter__.assert_called_once()
+        transfer_slot.__exit__.assert_called_once()
+
+    @patch("configuration_flow.preflight_config")
+    def test_restore_preflight_fails_fast(
+        self, mocked_preflight, mocked_save, mocked_restore
+    ):
+        # Arrange
+        self.resource_config.restore_preflight = True
+        mocked_preflight.side_effect = ConfigPreflightException(
+            "preflight_config", "config is truncated"
+        )
+        url = RemoteURL.from_str("ftp://server/configs/r-running")
+
+        # Act
+        with self.assertRaises(ConfigPreflightException):
+            self.flow._restore_flow(
+                url, ConfigurationType.RUNNING, RestoreMethod.OVERRIDE, None
+            )
+
+        # Assert
+        mocked_preflight.assert_called_once_with(
+            url, self.resource_config, self.flow._logger, full_config=True
+        )
+        mocked_restore.assert_not_called()
+
+    @patch("configuration_flow.preflight_config")
+    def test_restore_append_preflight(
+        self, mocked_preflight, mocked_save, mocked_restore
+    ):
+        # Arrange
+        self.resource_config.restore_preflight = True
+        url = RemoteURL.from_str("ftp://server/configs/snippet")
+
+        # Act
+        self.flow._restore_flow(
+            url, ConfigurationType.RUNNING, RestoreMethod.APPEND, None
+        )
+
+        # Assert
+        self.assertFalse(mocked_preflight.call_args.kwargs["full_config"])
+        mocked_restore.assert_called_once()
+
+    def _set_last_change(self, marker):
+        session = self.flow._cli_handler.get_cli_service.return_value.__enter__()
+        session.send_command.return_value = (
+            f"! Last configuration change at {marker} by admin\n"
+        )
+
+    @patch("configuration_flow.SAVED_CONFIGS", new_callable=SavedConfigsCache)
+    def test_save_skipped_when_unchanged(
+        self, saved_configs, mocked_save, mocked_restore
+    ):
+        # Arrange
+        self.resource_config.skip_unchanged_save = True
+        self._set_last_change("10:00:00 UTC Mon Oct 19 2026")
+        first_url = RemoteURL.from_str("tftp://server/configs/r-running-1")
+        second_url = RemoteURL.from_str("tftp://server/configs/r-running-2")
+
+        # Act
+        self.flow._save_flow(first_url, ConfigurationType.RUNNING, None)
+        first_save = saved_configs.get_last_save("10.0.0.10")
+        result = self.flow._save_flow(second_url, ConfigurationType.RUNNING, None)
+
+        # Assert
+        self.assertEqual("r-running-1", result)
+        self.assertTrue(self.flow.save_skipped)
+        mocked_save.assert_called_once()
+        self.assertEqual({"file_name": "r-running-1", "skipped": False}, first_save)
+        self.assertEqual(
+            {"file_name": "r-running-1", "skipped": True},
+            saved_configs.get_last_save("10.0.0.10"),
+        )
+
+    @patch("configuration_flow.SAVED_CONFIGS", SavedConfigsCache())
+    def test_save_not_skipped_when_changed(self, mocked_save, mocked_restore):
+        # Arrange
+        self.resource_config.skip_unchanged_save = True
+        url = RemoteURL.from_str("tftp://server/configs/r-running-1")
+
+        # Act
+        self._set_last_change("10:00:00 UTC Mon Oct 19 2026")
+        self.flow._save_flow(url, ConfigurationType.RUNNING, None)
+        self._set_last_change("10:05:00 UTC Mon Oct 19 2026")
+        self.flow._save_flow(url, ConfigurationType.RUNNING, None)
+        self.flow._save_flow(url, ConfigurationType.STARTUP, None)
+
+        # Assert
+        self.assertFalse(self.flow.save_skipped)
+        self.assertEqual(3, mocked_save.call_count)
+
+    @patch("configuration_flow.index_saved_config", side_effect=EOFError)
+    def test_save_indexed(self, mocked_index, mocked_save, _):
+        # Arrange
+        self.resource_config.index_saved_configs = True
+        mocked_save.return_value = "r-running-1"
+        url = RemoteURL.from_str("ftp://server/configs/r-running")
+
+        # Act
+        result = self.flow._save_flow(url, ConfigurationType.RUNNING, None)
+
+        # Assert
+        self.assertEqual("r-running-1", result)
+        indexed_url = mocked_index.call_args.args[0]
+        self.assertEqual("r-running-1", indexed_url.filename)
+        self.assertEqual("r-running", url.filename)
+        self.flow._logger.warning.assert_called_once()
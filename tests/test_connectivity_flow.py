@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from connectivity_flow import (
+    CiscoIOSConnectivityFlow,
+    CiscoIOSIFaceActions,
+    InterfaceNameIndex,
+    get_interface_index,
+)
+
+SHOW_IP_INTERFACE_BRIEF = """
+Interface              IP-Address      OK? Method Status                Protocol
+GigabitEthernet0/0/1   10.0.0.1        YES NVRAM  up                    up
+GigabitEthernet0/0/1.100 unassigned    YES unset  up                    up
+Serial0/1/0:0          unassigned      YES unset  administratively down down
+Port-channel1          unassigned      YES unset  down                  down
+"""
+
+
+class TestInterfaceNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = InterfaceNameIndex()
+        self.load_interfaces = Mock(
+            return_value=["GigabitEthernet0/0/1", "Serial0/1/0:0", "Port-channel1"]
+        )
+
+    def test_resolve_from_one_bulk_read(self):
+        # Act
+        names = [
+            self.index.resolve(port, self.load_interfaces)
+            for port in (
+                "Router/Chassis 0/GigabitEthernet0-0-1",
+                "Router/Chassis 0/Serial0-1-00",
+                "Router/Port-channel1",
+            )
+        ]
+
+        # Assert
+        self.assertEqual(
+            ["GigabitEthernet0/0/1", "Serial0/1/0:0", "Port-channel1"], names
+        )
+        self.load_interfaces.assert_called_once()
+
+    @patch("connectivity_flow.time.time", return_value=100)
+    def test_refresh_when_not_found(self, mocked_time):
+        # Arrange
+        self.index.resolve("Router/Port-channel1", self.load_interfaces)
+        self.load_interfaces.return_value = ["Port-channel1", "Port-channel2"]
+        mocked_time.return_value += InterfaceNameIndex.MIN_REFRESH_INTERVAL
+
+        # Act
+        name = self.index.resolve("Router/Port-channel2", self.load_interfaces)
+        missing = self.index.resolve("Router/Port-channel3", self.load_interfaces)
+
+        # Assert
+        self.assertEqual("Port-channel2", name)
+        self.assertIsNone(missing)
+        self.assertEqual(2, self.load_interfaces.call_count)
+
+    @patch("connectivity_flow.time.time", return_value=100)
+    def test_refresh_rate_limited(self, mocked_time):
+        # Arrange
+        self.index.resolve("Router/Port-channel1", self.load_interfaces)
+        mocked_time.return_value += InterfaceNameIndex.MIN_REFRESH_INTERVAL - 1
+
+        # Act
+        missing = [
+            self.index.resolve("Router/Port-channel2", self.load_interfaces)
+            for _ in range(3)
+        ]
+
+        # Assert
+        self.assertEqual([None, None, None], missing)
+        self.load_interfaces.assert_called_once()
+
+    @patch("connectivity_flow.time.time", return_value=100)
+    def test_expired_index_reloaded(self, mocked_time):
+        # Arrange
+        self.index.resolve("Router/Port-channel1", self.load_interfaces)
+        self.load_interfaces.return_value = ["GigabitEthernet0/0/1"]
+        mocked_time.return_value += InterfaceNameIndex.MAX_AGE + 1
+
+        # Act
+        deleted = self.index.resolve("Router/Port-channel1", self.load_interfaces)
+
+        # Assert
+        self.assertIsNone(deleted)
+        self.assertEqual(2, self.load_interfaces.call_count)
+
+    def test_no_refresh(self):
+        # Act
+        first = self.index.resolve("Router/Port-channel2", self.load_interfaces, False)
+        second = self.index.resolve("Router/Port-channel2", self.load_interfaces, False)
+
+        # Assert
+        self.assertIsNone(first)
+        self.assertIsNone(second)
+        self.load_interfaces.assert_called_once()
+
+    def test_concurrent_misses_refresh_once(self):
+        # Arrange
+        def load_interfaces():
+            time.sleep(0.05)
+            return ["GigabitEthernet0/0/1"]
+
+        load_interfaces = Mock(side_effect=load_interfaces)
+        threads = [
+            threading.Thread(
+                target=self.index.resolve,
+                args=("Router/GigabitEthernet0-0-1", load_interfaces),
+            )
+            for _ in range(5)
+        ]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        load_interfaces.assert_called_once()
+
+    def test_get_interface_index(self):
+        self.assertIs(get_interface_index("10.0.0.1"), get_interface_index("10.0.0.1"))
+        self.assertIsNot(
+            get_interface_index("10.0.0.1"), get_interface_index("10.0.0.2")
+        )
+
+
+@patch("connectivity_flow.CommandTemplateExecutor")
+class TestCiscoIOSIFaceActions(unittest.TestCase):
+    def setUp(self):
+        self.index = InterfaceNameIndex()
+        self.iface_actions = CiscoIOSIFaceActions(Mock(), Mock(), self.index)
+
+    def test_get_interfaces(self, mocked_executor):
+        # Arrange
+        mocked_executor.return_value.execute_command.return_value = (
+            SHOW_IP_INTERFACE_BRIEF
+        )
+
+        # Act
+        interfaces = self.iface_actions.get_interfaces()
+
+        # Assert
+        self.assertEqual(
+            [
+                "GigabitEthernet0/0/1",
+                "GigabitEthernet0/0/1.100",
+                "Serial0/1/0:0",
+                "Port-channel1",
+            ],
+            interfaces,
+        )
+
+    def test_get_port_name(self, mocked_executor):
+        # Arrange
+        mocked_executor.return_value.execute_command.return_value = (
+            SHOW_IP_INTERFACE_BRIEF
+        )
+
+        # Act
+        serial = self.iface_actions.get_port_name("Router/Chassis 0/Serial0-1-00")
+        new = self.iface_actions.get_port_name("Router/Port-channel5")
+
+        # Assert
+        self.assertEqual("Serial0/1/0:0", serial)
+        self.assertEqual("Port-channel5", new)
+        mocked_executor.return_value.execute_command.assert_called_once()
+
+    def test_connectivity_flow_uses_index(self, mocked_executor):
+        # Arrange
+        flow = CiscoIOSConnectivityFlow(Mock(), Mock(), self.index)
+
+        # Act
+        iface_actions = flow._get_iface_actions(Mock())
+
+        # Assert
+        self.assertIsInstance(iface_actions, CiscoIOSIFaceActions)
+        self.assertIs(self.index, iface_actions._interface_index)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from firmware_flow import (
+    BACK_ONLINE_PHASE,
+    COPY_PHASE,
+    RELOAD_PHASE,
+    VERIFY_PHASE,
+    CiscoIOSFirmwareFlow,
+    PhaseTimer,
+    ReloadTimeoutException,
+    wait_for_port,
+)
+
+
+@patch("firmware_flow.time.sleep")
+@patch("firmware_flow.is_port_open")
+class TestWaitForPort(unittest.TestCase):
+    def test_probes_with_exponential_backoff(self, mocked_is_open, mocked_sleep):
+        # Arrange
+        mocked_is_open.side_effect = [False] * 5 + [True]
+
+        # Act
+        wait_for_port("10.0.0.1", 22, initial_delay=5, max_delay=30)
+
+        # Assert
+        self.assertEqual(
+            [5, 10, 20, 30, 30], [c.args[0] for c in mocked_sleep.call_args_list]
+        )
+        mocked_is_open.assert_called_with("10.0.0.1", 22, 3)
+
+    def test_wait_offline(self, mocked_is_open, mocked_sleep):
+        # Arrange
+        mocked_is_open.side_effect = [True, False]
+
+        # Act
+        wait_for_port("10.0.0.1", 22, online=False)
+
+        # Assert
+        self.assertEqual(1, mocked_sleep.call_count)
+
+    @patch("firmware_flow.time.monotonic")
+    def test_timeout(self, mocked_time, mocked_is_open, mocked_sleep):
+        # Arrange
+        mocked_is_open.return_value = False
+        mocked_time.side_effect = [0, 50, 100]
+
+        # Act
+        with self.assertRaises(ReloadTimeoutException):
+            wait_for_port("10.0.0.1", 22, timeout=100)
+
+        # Assert
+        self.assertEqual([5], [c.args[0] for c in mocked_sleep.call_args_list])
+
+
+@patch("firmware_flow.wait_for_port")
+@patch("firmware_flow.CommandTemplateExecutor")
+@patch("firmware_flow.SystemActions")
+class TestCiscoIOSFirmwareFlow(unittest.TestCase):
+    def setUp(self):
+        self.cli_handler = MagicMock()
+        self.session = (
+            self.cli_handler.get_cli_service.return_value.__enter__.return_value
+        )
+        self.session.session = Mock(SESSION_TYPE="SSH", host="10.0.0.1", port=22)
+        self.flow = CiscoIOSFirmwareFlow(
+            self.cli_handler, Mock(), Mock(vrf_management_name="")
+        )
+        self.flow._apply_firmware = Mock()
+
+    def _prepare_system_actions(self, mocked_actions, os_version):
+        system_actions = mocked_actions.return_value
+        system_actions.get_flash_folders_list.return_value = ["bootflash:"]
+        system_actions.get_current_boot_config.return_value = (
+            "boot system bootflash:/ios.bin"
+        )
+        system_actions.get_current_os_version.return_value = os_version
+        return system_actions
+
+    def test_load_firmware_phases(self, mocked_actions, mocked_executor, mocked_wait):
+        # Arrange
+        system_actions = self._prepare_system_actions(
+            mocked_actions, 'System image file is "bootflash:/ios.bin"'
+        )
+        mocked_executor.return_value.execute_command.side_effect = [
+            "% Invalid input detected",
+            "",
+        ]
+
+        # Act
+        durations = self.flow.load_firmware("tftp://10.0.0.2/ios.bin")
+
+        # Assert
+        self.assertEqual(
+            {COPY_PHASE, VERIFY_PHASE, RELOAD_PHASE, BACK_ONLINE_PHASE}, set(durations)
+        )
+        self.assertEqual(
+            "bootflash:/ios.bin", system_actions.copy.call_args_list[0].args[1]
+        )
+        system_actions.reload_device.assert_not_called()
+        self.assertEqual(2, mocked_executor.return_value.execute_command.call_count)
+        self.assertEqual(
+            [False, True], [c.kwargs["online"] for c in mocked_wait.call_args_list]
+        )
+        self.session.reconnect.assert_called_once()
+
+    def test_transfer_slot_held_while_copying(
+        self, mocked_actions, mocked_executor, mocked_wait
+    ):
+        # Arrange
+        system_actions = self._prepare_system_actions(
+            mocked_actions, 'System image file is "bootflash:/ios.bin"'
+        )
+        transfer_slot = MagicMock()
+        transfer_slot.__exit__.side_effect = (
+            lambda *args: system_actions.get_current_boot_image.assert_not_called()
+        )
+        flow = CiscoIOSFirmwareFlow(
+            self.cli_handler, Mock(), Mock(vrf_management_name=""), transfer_slot
+        )
+        flow._apply_firmware = Mock()
+
+        # Act
+        flow.load_firmware("tftp://10.0.0.2/ios.bin")
+
+        # Assert
+        transfer_slot.__enter__.assert_called_once()
+        transfer_slot.__exit__.assert_called_once()
+        mocked_wait.assert_called()
+
+    def test_load_firmware_not_loaded(
+        self, mocked_actions, mocked_executor, mocked_wait
+    ):
+        # Arrange
+        self._prepare_system_actions(mocked_actions, "bootflash:/old.bin")
+
+        # Act
+        with self.assertRaises(Exception):
+            self.flow.load_firmware("tftp://10.0.0.2/ios.bin")
+
+        # Assert
+        self.assertIn(BACK_ONLINE_PHASE, self.flow.phase_timer.durations)
+
+    def test_device_not_back_online(self, mocked_actions, mocked_executor, mocked_wait):
+        # Arrange
+        self._prepare_system_actions(mocked_actions, "bootflash:/ios.bin")
+        mocked_wait.side_effect = [
+            ReloadTimeoutException("wait_for_port", "still open"),
+            ReloadTimeoutException("wait_for_port", "still closed"),
+        ]
+
+        # Act
+        with self.assertRaises(ReloadTimeoutException):
+            self.flow.load_firmware("tftp://10.0.0.2/ios.bin")
+
+        # Assert
+        self.assertEqual(2, mocked_wait.call_count)
+        self.session.reconnect.assert_not_called()
+
+
+class TestPhaseTimer(unittest.TestCase):
+    @patch("firmware_flow.time.monotonic", side_effect=[0, 2, 10, 11])
+    def test_repeated_phase_adds_up(self, mocked_time):
+        # Arrange
+        timer = PhaseTimer()
+
+        # Act
+        with timer.phase(VERIFY_PHASE):
+            pass
+        with timer.phase(VERIFY_PHASE):
+            pass
+
+        # Assert
+        self.assertEqual({VERIFY_PHASE: 3}, timer.durations)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from circuit_breaker import get_circuit_breaker
+from fleet_operations import (
+    FleetOperationsFlow,
+    get_backup_server,
+    get_resource_context,
+    parse_resource_names,
+)
+
+
+class TestFleetOperations(unittest.TestCase):
+    def setUp(self):
+        self.api = Mock()
+        self.api.GetResourceDetails.side_effect = lambda name: Mock(
+            Name=name,
+            Address=f"{name}-address",
+            ResourceAttributes=[Mock(Name="Model.User", Value="admin")],
+        )
+        self.context = Mock()
+
+    def test_parse_resource_names(self):
+        self.assertEqual(["r1", "r2", "r3"], parse_resource_names(" r1, r2;r3,,r1 "))
+
+    def test_get_resource_context(self):
+        # Act
+        context = get_resource_context(self.api, self.context, "r1")
+
+        # Assert
+        self.assertEqual("r1", context.resource.name)
+        self.assertEqual("r1-address", context.resource.address)
+        self.assertEqual({"Model.User": "admin"}, context.resource.attributes)
+        self.assertIs(self.context.reservation, context.reservation)
+
+    def test_get_backup_server(self):
+        resource_config = Mock(backup_location="tftp://10.0.0.1/configs")
+        custom_params = '{"custom_params": {"folder_path": "ftp://Server/folder"}}'
+
+        self.assertEqual("10.0.0.1", get_backup_server(resource_config))
+        self.assertEqual("server", get_backup_server(resource_config, custom_params))
+        self.assertEqual("", get_backup_server(Mock(backup_location="flash:/")))
+
+    def test_run_collects_results_and_errors(self):
+        # Arrange
+        flow = FleetOperationsFlow(Mock(), self.api, self.context)
+
+        def operation(conf, transfer_slot):
+            if conf.name == "bad":
+                raise Exception("failed")
+            return f"saved {conf.name}"
+
+        # Act
+        results, errors, durations = flow.run(
+            ["r1", "bad", "r2"],
+            get_config=lambda ctx: ctx.resource,
+            operation=operation,
+        )
+
+        # Assert
+        self.assertEqual({"r1", "r2"}, set(results))
+        self.assertEqual({"bad": "failed"}, errors)
+        self.assertEqual({"r1", "r2"}, set(durations))
+
+    def test_run_limits_transfers_per_server(self):
+        # Arrange
+        flow = FleetOperationsFlow(
+            Mock(), self.api, self.context, max_workers=6, max_connections_per_server=2
+        )
+        lock = threading.Lock()
+        active = {"operations": 0, "transfers": 0}
+        maximum = {"operations": 0, "transfers": 0}
+
+        def count(name, value):
+            with lock:
+                active[name] += value
+                maximum[name] = max(maximum[name], active[name])
+
+        def operation(conf, transfer_slot):
+            count("operations", 1)
+            with transfer_slot:
+                count("transfers", 1)
+                time.sleep(0.05)
+                count("transfers", -1)
+            time.sleep(0.05)
+            count("operations", -1)
+
+        # Act
+        flow.run(
+            [f"r{i}" for i in range(6)],
+            get_config=lambda ctx: Mock(),
+            operation=operation,
+            get_server=lambda conf: "tftp-server",
+        )
+
+        # Assert
+        self.assertEqual(2, maximum["transfers"])
+        self.assertEqual(6, maximum["operations"])
+
+    def test_run_skips_open_circuit(self):
+        # Arrange
+        flow = FleetOperationsFlow(Mock(), self.api, self.context)
+        get_circuit_breaker("down-address", 1).record_failure()
+        operation = Mock(return_value="saved")
+
+        # Act
+        results, errors, durations = flow.run(
+            ["up", "down"],
+            get_config=lambda ctx: ctx.resource,
+            operation=operation,
+        )
+
+        # Assert
+        self.assertEqual({"up"}, set(results))
+        self.assertIn("unreachable", errors["down"])
+        operation.assert_called_once()
+
+    def test_run_in_waves_skips_after_failures(self):
+        # Arrange
+        flow = FleetOperationsFlow(Mock(), self.api, self.context)
+        waves = []
+
+        def operation(conf, transfer_slot):
+            waves.append(conf.name)
+            if conf.name == "r3":
+                raise Exception("failed")
+            return conf.name
+
+        # Act
+        results, errors, durations, skipped = flow.run_in_waves(
+            [f"r{i}" for i in range(1, 8)],
+            wave_size=3,
+            get_config=lambda ctx: ctx.resource,
+            operation=operation,
+        )
+
+        # Assert
+        self.assertEqual({"r1", "r2", "r3"}, set(waves))
+        self.assertEqual({"r3": "failed"}, errors)
+        self.assertEqual(["r4", "r5", "r6", "r7"], skipped)
+
+    def test_run_in_waves_tolerates_failures(self):
+        # Arrange
+        flow = FleetOperationsFlow(Mock(), self.api, self.context)
+
+        # Act
+        results, errors, durations, skipped = flow.run_in_waves(
+            ["r1", "bad", "r2"],
+            wave_size=1,
+            get_config=lambda ctx: ctx.resource,
+            operation=lambda conf, slot: 1 / (conf.name != "bad"),
+            max_failures=1,
+        )
+
+        # Assert
+        self.assertEqual({"r1", "r2"}, set(results))
+        self.assertEqual(["bad"], list(errors))
+        self.assertEqual([], skipped)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+import unittest
+from unittest.mock import Mock
+
+from cloudshell.shell.standards.core.autoload.resource_model import ResourceNode
+from cloudshell.shell.standards.networking.autoload_model import NetworkingResourceModel
+
+from inventory_model import CompactAttributes, CompactNetworkingResourceModel
+
+
+def get_api():
+    api = Mock()
+    api.GetResourceDetails.return_value = Mock(UniqeIdentifier="uid", ChildResources=[])
+    return api
+
+
+def build_inventory(model_class):
+    resource_model = model_class(
+        "Switch", "Cisco IOS Switch 2G", "CS_Switch", get_api()
+    )
+    resource_model.vendor = "Cisco"
+    resource_model.model_name = "C9300"
+    entities = resource_model.entities
+    chassis = entities.Chassis(index="1")
+    chassis.model = "C9300-48P"
+    chassis.serial_number = "FOC1234"
+    resource_model.connect_chassis(chassis)
+    for module_index in ("1", "2"):
+        module = entities.Module(index=module_index)
+        module.model = f"Module {module_index}"
+        chassis.connect_module(module)
+        sub_module = entities.SubModule(index="1")
+        module.connect_sub_module(sub_module)
+        for port_index in ("1", "2"):
+            port = entities.Port(
+                index=port_index, name=f"Gi{module_index}-{port_index}"
+            )
+            port.mac_address = f"00:11:22:33:4{module_index}:0{port_index}"
+            port.mtu = 1500
+            sub_module.connect_port(port)
+    chassis.connect_module(entities.Module(index="3"))
+    chassis.connect_power_port(entities.PowerPort(index="1"))
+    port_channel = entities.PortChannel(index="1", name="Po1")
+    port_channel.associated_ports = "Gi1/1; Gi2/1"
+    resource_model.connect_port_channel(port_channel)
+    return resource_model
+
+
+class TestInventoryModel(unittest.TestCase):
+    def test_build_same_details_as_standard_model(self):
+        # Arrange
+        standard_model = build_inventory(NetworkingResourceModel)
+        compact_model = build_inventory(CompactNetworkingResourceModel)
+
+        # Act
+        standard_details = standard_model.build()
+        compact_details = compact_model.build()
+
+        # Assert
+        self.assertEqual(
+            [vars(r) for r in standard_details.resources],
+            [vars(r) for r in compact_details.resources],
+        )
+        self.assertEqual(
+            [vars(a) for a in standard_details.attributes],
+            [vars(a) for a in compact_details.attributes],
+        )
+        self.assertNotIn(
+            "CH1/M3", [r.relative_address for r in compact_details.resources]
+        )
+
+    def test_resource_attributes(self):
+        # Arrange
+        resource_model = build_inventory(CompactNetworkingResourceModel)
+        port = resource_model.entities.Port(index="5", name="Gi1-5")
+
+        # Act
+        port.port_description = "uplink"
+
+        # Assert
+        self.assertIsInstance(port.attributes, CompactAttributes)
+        self.assertEqual("uplink", port.port_description)
+        self.assertEqual(0, port.mtu)
+        self.assertEqual("Gi1-5", port.name)
+        self.assertEqual(1, len(port.attributes))
+
+    def test_name_is_kept_in_instance(self):
+        # Arrange
+        entities = CompactNetworkingResourceModel(
+            "Switch", "Cisco IOS Switch 2G", "CS_Switch", get_api()
+        ).entities
+
+        # Act
+        first = entities.Port(index="1", name="Gi1-1")
+        second = entities.Port(index="2", name="Gi1-2")
+
+        # Assert
+        self.assertEqual("Gi1-1", first.name)
+        self.assertEqual("Gi1-2", second.name)
+        self.assertNotIn(first, ResourceNode._name.value_container)
+        self.assertNotIn(second, ResourceNode._name.value_container)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+import re
+import unittest
+from unittest.mock import MagicMock, Mock
+
+from run_command_flow import CiscoIOSRunCommandFlow
+
+
+class FakeSession:
+    """Echo the sent lines as IOS does, with an error for 'bad' lines."""
+
+    def __init__(self):
+        self.sent = []
+        self.expect_calls = 0
+
+    def send_line(self, command, logger):
+        self.sent.append(command)
+
+    def hardware_expect(self, command, expected_string, logger):
+        self.expect_calls += 1
+        output = ""
+        for line in self.sent:
+            output += f"{line}\r\n"
+            if line.startswith("bad"):
+                output += (
+                    "                ^\r\n% Invalid input detected at '^' marker.\r\n"
+                )
+            output += "Router(config)#"
+        self.sent = []
+        assert re.search(expected_string, output, re.DOTALL)
+        return output
+
+
+class TestCiscoIOSRunCommandFlow(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession()
+        self.cli_handler = MagicMock()
+        service = self.cli_handler.config_mode_service.return_value
+        service.__enter__.return_value.session = self.session
+
+    def test_config_is_pushed_in_windows(self):
+        # Arrange
+        flow = CiscoIOSRunCommandFlow(Mock(), self.cli_handler, window_size=2)
+        commands = ";".join(["ip prefix-list a permit 10.0.0.0/8", "bad line"] * 3)
+
+        # Act
+        result = flow.run_custom_config_command(commands)
+
+        # Assert
+        self.assertEqual(3, self.session.expect_calls)
+        self.assertIn("Pushed 6 config lines", result)
+        self.assertIn("failed 3 lines", result)
+        self.assertIn("Line 2: bad line: % Invalid input detected", result)
+        self.assertIn("Line 6: bad line", result)
+        self.assertNotIn("Line 1:", result)
+
+    def test_pipelining_disabled(self):
+        # Arrange
+        flow = CiscoIOSRunCommandFlow(Mock(), self.cli_handler, window_size=1)
+        session = self.cli_handler.config_mode_service.return_value.__enter__()
+        session.send_command.return_value = "output"
+
+        # Act
+        result = flow.run_custom_config_command("hostname r1;ip domain name x")
+
+        # Assert
+        self.assertEqual("output\noutput", result)
+        self.assertEqual(0, self.session.expect_calls)
+
+    def test_not_pipelined_lines_sent_line_by_line(self):
+        # Arrange
+        flow = CiscoIOSRunCommandFlow(Mock(), self.cli_handler, window_size=50)
+        session = self.cli_handler.config_mode_service.return_value.__enter__()
+        session.send_command.return_value = "output"
+
+        for commands in (
+            "interface Gi0/1;description uplink;exit;hostname r1",
+            "hostname r1;crypto key generate rsa modulus 2048",
+            "banner motd ^;maintenance window^",
+        ):
+            # Act
+            flow.run_custom_config_command(commands)
+
+            # Assert
+            self.assertEqual(0, self.session.expect_calls)
+
+    def test_get_failed_lines_skips_previous_prompt(self):
+        output = "Router(config)#bad\r\n% Incomplete command.\r\nRouter(config)#"
+
+        failed = CiscoIOSRunCommandFlow._get_failed_lines(["bad"], output, 10)
+
+        self.assertEqual([(11, "bad", "% Incomplete command.")], failed)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+import tempfile
+import time
+import unittest
+from threading import Thread
+from unittest.mock import MagicMock, Mock, patch
+
+from session_leases import (
+    DeviceSessionLeases,
+    LeasingSessionPoolManager,
+    SessionLeaseException,
+    device_lock,
+)
+
+
+class TestSessionLeases(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.leases = DeviceSessionLeases("10.0.0.1", 2, self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_slots_are_limited(self):
+        # Arrange
+        other_process_leases = DeviceSessionLeases("10.0.0.1", 2, self.tmp_dir.name)
+        first = self.leases.acquire(1)
+        second = other_process_leases.acquire(1)
+
+        # Act & Assert
+        with self.assertRaises(SessionLeaseException):
+            self.leases.acquire(0.1)
+        self.leases.release(first)
+        self.leases.release(self.leases.acquire(0.1))
+        other_process_leases.release(second)
+
+    def test_devices_are_independent(self):
+        # Arrange
+        other_device = DeviceSessionLeases("10.0.0.2", 1, self.tmp_dir.name)
+        leases = [self.leases.acquire(1), self.leases.acquire(1)]
+
+        # Act
+        lease = other_device.acquire(0.1)
+
+        # Assert
+        other_device.release(lease)
+        for lease in leases:
+            self.leases.release(lease)
+
+    def test_device_lock_waits_for_other_process(self):
+        # Arrange
+        events = []
+
+        def run_locked(name):
+            with device_lock("10.0.0.1", self.tmp_dir.name):
+                events.append(f"{name} started")
+                time.sleep(0.1)
+                events.append(f"{name} done")
+
+        other_process = Thread(target=run_locked, args=("other",))
+
+        # Act
+        with device_lock("10.0.0.1", self.tmp_dir.name):
+            other_process.start()
+            time.sleep(0.1)
+            events.append("locked")
+        other_process.join(5)
+
+        # Assert
+        self.assertEqual(["locked", "other started", "other done"], events)
+
+    def _create_pool(self, max_sessions, pool_timeout=5):
+        session_manager = MagicMock()
+        session_manager.new_session.side_effect = lambda *args: Mock()
+        session_manager.existing_sessions_count.return_value = 0
+        return LeasingSessionPoolManager(
+            DeviceSessionLeases("10.0.0.1", max_sessions, self.tmp_dir.name),
+            session_manager=session_manager,
+            max_pool_size=max_sessions,
+            pool_timeout=pool_timeout,
+        )
+
+    def test_pool_releases_slot_when_session_is_returned(self):
+        # Arrange
+        pool = self._create_pool(1, pool_timeout=0.1)
+        other_process_pool = self._create_pool(1, pool_timeout=0.1)
+        session = pool.get_session([], "#", Mock())
+        with self.assertRaises(SessionLeaseException):
+            other_process_pool.get_session([], "#", Mock())
+
+        # Act
+        pool.return_session(session, Mock())
+        other_session = other_process_pool.get_session([], "#", Mock())
+
+        # Assert
+        self.assertIsNot(session, other_session)
+        with self.assertRaises(SessionLeaseException):
+            pool.get_session([], "#", Mock())
+        other_process_pool.remove_session(other_session, Mock())
+        self.assertIs(session, pool.get_session([], "#", Mock()))
+
+    def test_waiter_takes_session_returned_to_pool(self):
+        # Arrange
+        pool = self._create_pool(1, pool_timeout=30)
+        # without the wake up the waiter would poll the slot after 10 sec
+        pool._leases.POLL_INTERVAL = 10
+        session = pool.get_session([], "#", Mock())
+        result = []
+        waiter = Thread(target=lambda: result.append(pool.get_session([], "#", Mock())))
+        waiter.start()
+        time.sleep(0.1)
+
+        # Act
+        pool.return_session(session, Mock())
+        waiter.join(5)
+
+        # Assert
+        self.assertEqual([session], result)
+        pool._session_manager.new_session.assert_called_once()
+
+    @patch("session_leases.SessionPoolManager._new_session")
+    def test_pool_releases_slot_on_failure(self, mocked_new_session):
+        # Arrange
+        leases = MagicMock()
+        mocked_new_session.side_effect = Exception("connection failed")
+        pool = LeasingSessionPoolManager(
+            leases, session_manager=MagicMock(), max_pool_size=2, pool_timeout=5
+        )
+        pool._session_manager.existing_sessions_count.return_value = 0
+
+        # Act
+        with self.assertRaises(Exception):
+            pool.get_session([], "#", Mock())
+
+        # Assert
+        leases.release.assert_called_once_with(leases.acquire.return_value)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from cloudshell.snmp.snmp_parameters import SNMPV3Parameters
+from pysnmp.entity import config
+
+from snmp_cache import INCOMING_MSG_EXECPOINT, CachingSnmpSecurity, SnmpV3KeyCache
+
+ENGINE_ID = b"\x80\x00\x00\x09\x03\x00\x11\x22\x33\x44\x55"
+
+
+class TestSnmpCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SnmpV3KeyCache()
+        self.snmp_parameters = SNMPV3Parameters(
+            "10.0.0.1",
+            "user",
+            "auth-password",
+            "priv-password",
+            snmp_auth_protocol=SNMPV3Parameters.AUTH_SHA,
+            snmp_private_key_protocol=SNMPV3Parameters.PRIV_AES128,
+        )
+
+    def _add_security(self, snmp_engine):
+        py_snmp_params = Mock(snmp_parameters=self.snmp_parameters, user="user")
+        CachingSnmpSecurity(py_snmp_params, Mock(), self.cache).add_security(
+            snmp_engine
+        )
+
+    def test_master_keys_are_hashed_once(self):
+        # Arrange
+        args = (config.USM_AUTH_HMAC96_SHA, b"auth", config.USM_PRIV_CFB128_AES, b"p")
+
+        # Act
+        with patch.object(
+            config.AUTH_SERVICES[config.USM_AUTH_HMAC96_SHA],
+            "hash_passphrase",
+            wraps=config.AUTH_SERVICES[config.USM_AUTH_HMAC96_SHA].hash_passphrase,
+        ) as hash_passphrase:
+            first = self.cache.get_master_keys(*args)
+            second = self.cache.get_master_keys(*args)
+
+        # Assert
+        self.assertEqual(first, second)
+        hash_passphrase.assert_called_once()
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test_engine_id_change_invalidates_localized_keys(self):
+        # Arrange
+        keys = self.cache.get_master_keys(
+            config.USM_AUTH_HMAC96_SHA, b"auth", config.USM_PRIV_NONE, None
+        )
+        args = ("user", config.USM_AUTH_HMAC96_SHA, config.USM_PRIV_NONE, keys)
+        self.assertFalse(self.cache.set_engine_id("10.0.0.1", ENGINE_ID))
+        self.cache.get_localized_keys(ENGINE_ID, *args)
+
+        # Act
+        changed = self.cache.set_engine_id("10.0.0.1", b"\x80new-engine")
+
+        # Assert
+        self.assertTrue(changed)
+        self.assertEqual(b"\x80new-engine", self.cache.get_engine_id("10.0.0.1"))
+        self.assertEqual({}, self.cache._localized_keys)
+
+    def test_localized_keys_depend_on_priv_key(self):
+        # Arrange
+        protocols = (config.USM_AUTH_HMAC96_SHA, config.USM_PRIV_CFB128_AES)
+        first_keys = self.cache.get_master_keys(
+            protocols[0], b"auth", protocols[1], b"priv-password"
+        )
+        second_keys = self.cache.get_master_keys(
+            protocols[0], b"auth", protocols[1], b"new-priv-password"
+        )
+
+        # Act
+        first = self.cache.get_localized_keys(ENGINE_ID, "user", *protocols, first_keys)
+        second = self.cache.get_localized_keys(
+            ENGINE_ID, "user", *protocols, second_keys
+        )
+
+        # Assert
+        self.assertEqual(first[0], second[0])
+        self.assertNotEqual(first[1], second[1])
+
+    @patch("snmp_cache.config.add_v3_user")
+    def test_add_security_uses_cached_engine(self, add_v3_user):
+        # Arrange
+        self.cache.set_engine_id("10.0.0.1", ENGINE_ID)
+        snmp_engine = MagicMock()
+
+        # Act
+        self._add_security(snmp_engine)
+
+        # Assert
+        self.assertEqual(2, add_v3_user.call_count)
+        local_user, remote_user = add_v3_user.call_args_list
+        self.assertEqual(config.USM_KEY_TYPE_MASTER, local_user.kwargs["authKeyType"])
+        self.assertEqual(ENGINE_ID, bytes(remote_user.kwargs["securityEngineId"]))
+        self.assertEqual(
+            config.USM_KEY_TYPE_LOCALIZED, remote_user.kwargs["privKeyType"]
+        )
+
+    @patch("snmp_cache.config.add_v3_user")
+    def test_engine_id_learned_from_responses(self, add_v3_user):
+        # Arrange
+        snmp_engine = MagicMock()
+        self._add_security(snmp_engine)
+        callback, execpoint = snmp_engine.observer.register_observer.call_args.args
+
+        # Act
+        callback(snmp_engine, execpoint, {"securityEngineId": ENGINE_ID}, None)
+
+        # Assert
+        self.assertEqual(INCOMING_MSG_EXECPOINT, execpoint)
+        self.assertEqual(1, add_v3_user.call_count)
+        self.assertEqual(ENGINE_ID, self.cache.get_engine_id("10.0.0.1"))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+import logging
+import unittest
+from unittest.mock import Mock, patch
+
+from transcript_logging import (
+    TranscriptFilter,
+    TranscriptLoggingSessionContext,
+    is_transcript_enabled,
+    parse_transcript_modes,
+)
+
+
+class TestTranscriptLogging(unittest.TestCase):
+    def test_parse_transcript_modes(self):
+        self.assertEqual(
+            {None: 1.0, "get_inventory": 0.1, "save": 0.0},
+            parse_transcript_modes("on, get_inventory=0.1, save=off, bad=x"),
+        )
+        self.assertTrue(is_transcript_enabled(""))
+        self.assertFalse(is_transcript_enabled("off, save=on", "restore"))
+        self.assertTrue(is_transcript_enabled("off, save=on", "save"))
+
+    def test_transcript_filter(self):
+        transcript_filter = TranscriptFilter()
+        self.assertFalse(
+            transcript_filter.filter(Mock(module="expect_session", levelno=10))
+        )
+        self.assertTrue(transcript_filter.filter(Mock(module="driver", levelno=10)))
+
+    @patch.object(TranscriptLoggingSessionContext, "get_logger_for_context")
+    def test_transcript_switched_off_per_command(self, mocked_get_logger):
+        # Arrange
+        mocked_get_logger.return_value = logging.getLogger("test_transcript_logging")
+        context = Mock()
+        context.resource.model = "Cisco IOS Router 2G"
+        context.resource.attributes = {
+            "Cisco IOS Router 2G.CLI Transcript Logging": "on, save=off"
+        }
+
+        # Act
+        with TranscriptLoggingSessionContext(context, "save") as save_logger:
+            save_filters = list(save_logger.filters)
+        with TranscriptLoggingSessionContext(context, "restore") as restore_logger:
+            restore_filters = list(restore_logger.filters)
+
+        # Assert
+        self.assertTrue(any(isinstance(f, TranscriptFilter) for f in save_filters))
+        self.assertEqual([], restore_filters)